@@ -5,4 +5,6 @@ Sikuwa 构建工具
 """
 
 __version__ = "1.3.0"
+# 命令行 --version 显示的版本
+CLI_VERSION = "1.2.0"
 __author__ = "Sikuwa Team"
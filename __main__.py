@@ -3,8 +3,25 @@
 Sikuwa 入口点
 """
 
+def _fast_path(argv) -> bool:
+    """
+    无需加载 CLI 即可应答的参数，处理后返回 True
+
+    仅 --version：输出与 click.version_option 一致，
+    --help 的内容来自各命令 docstring，仍交给 Click 生成
+    """
+    if argv == ['--version']:
+        from sikuwa import CLI_VERSION
+        print(f"sikuwa, version {CLI_VERSION}")
+        return True
+    return False
+
+
 def main():
     """主入口函数 - 延迟导入避免循环依赖"""
+    import sys
+    if _fast_path(sys.argv[1:]):
+        return
     try:
         # 延迟导入，避免 mypyc 编译问题
         from sikuwa.cli import main as cli_main
@@ -250,9 +250,19 @@ class SikuwaBuilder:
             embed_python=native_opts.embed_python,
             python_static=native_opts.python_static,
             lto=native_opts.lto,
+            thin_lto=native_opts.thin_lto,
+            incremental_lto=native_opts.incremental_lto,
+            march=native_opts.march,
+            fast_math=native_opts.fast_math,
             strip=native_opts.strip,
             debug=native_opts.debug,
             keep_c_source=native_opts.keep_c_source,
+            jobs=native_opts.jobs,
+            use_ccache=native_opts.use_ccache,
+            hardlink_runtime=native_opts.hardlink_runtime,
+            single_shot=native_opts.single_shot,
+            distributor=native_opts.distributor,
+            object_cache=native_opts.object_cache,
         )
         
         # 执行编译
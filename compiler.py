@@ -9,12 +9,19 @@ import shutil
 import sys
 import os
 import tempfile
+import threading
 import hashlib
+import json
+import marshal
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, Union
 from dataclasses import dataclass, field
-from datetime import datetime
 import traceback
+from collections import deque
 
 # 兼容扁平结构和包结构的导入
 try:
@@ -25,6 +32,70 @@ except ImportError:
     from i18n import _
 
 
+# 打包的标准库文件名（输出目录下，生成的主程序会将其加入 sys.path）
+STDLIB_ZIP_NAME = "python_stdlib.zip"
+
+# 生成代码格式版本：修改 _builtin_convert / _generate_main_wrapper 等生成逻辑时需递增，
+# 使转换缓存中旧格式的 .c 文件失效
+_CODEGEN_FORMAT_VERSION = "2"
+
+_C_UCN_CONTROL = re.compile(r'(\\\\)|\\u00([01][0-9a-f])')
+
+
+def _c_string_body(text: str) -> str:
+    """
+    转义为 C 字符串字面量内容（不含两端引号）
+    
+    json.dumps 在 C 层一次完成转义；C 不允许用 \\uXXXX 表示 0xA0 以下的字符，
+    json 输出的其余控制字符改写为八进制转义
+    """
+    escaped = json.dumps(text, ensure_ascii=False)[1:-1]
+    if '\\u00' in escaped:
+        escaped = _C_UCN_CONTROL.sub(
+            lambda m: m.group(1) or f"\\{int(m.group(2), 16):03o}", escaped
+        )
+    return escaped
+
+
+def _cython_worker_init():
+    """进程池初始化：不写 .pyc，并预先导入 Cython 编译器"""
+    sys.dont_write_bytecode = True
+    import Cython.Compiler.Main  # noqa: F401
+
+
+def _cython_worker(py_file: str, c_file: str, embed: bool) -> Optional[str]:
+    """
+    进程内调用 Cython 转换单个文件（供进程池使用）
+
+    Returns:
+        成功返回 None，失败返回 Cython 的错误输出
+    """
+    import io
+    from contextlib import redirect_stderr
+    from Cython.Compiler import Options
+    from Cython.Compiler.Main import compile_single
+    
+    options = Options.CompilationOptions(
+        Options.default_options,
+        language_level=3,  # Python 3 语法
+        output_file=c_file,
+    )
+    # --embed 是 Cython 的全局选项
+    saved_embed = Options.embed
+    Options.embed = "main" if embed else None
+    errors = io.StringIO()
+    try:
+        with redirect_stderr(errors):
+            result = compile_single(py_file, options, full_module_name=None)
+    except Exception as e:
+        return f"{errors.getvalue()}{e}"
+    finally:
+        Options.embed = saved_embed
+    if result.num_errors:
+        return errors.getvalue()
+    return None
+
+
 @dataclass
 class CompilerConfig:
     """编译器配置"""
@@ -37,8 +108,8 @@ class CompilerConfig:
     cxx: str = "g++"      # C++ 编译器
     
     # 编译选项
-    c_flags: List[str] = field(default_factory=lambda: ["-O2", "-fPIC"])
-    cxx_flags: List[str] = field(default_factory=lambda: ["-O2", "-fPIC", "-std=c++17"])
+    c_flags: List[str] = field(default_factory=lambda: ["-O3", "-fPIC", "-fno-semantic-interposition"])
+    cxx_flags: List[str] = field(default_factory=lambda: ["-O3", "-fPIC", "-fno-semantic-interposition", "-std=c++17"])
     link_flags: List[str] = field(default_factory=list)
     
     # 输出选项
@@ -51,13 +122,27 @@ class CompilerConfig:
     python_static: bool = False  # 静态链接 Python
     
     # 优化选项
-    lto: bool = False            # Link Time Optimization
+    lto: bool = True             # Link Time Optimization（调试模式下不启用）
+    thin_lto: bool = False       # Clang 使用 ThinLTO
+    incremental_lto: bool = False  # GCC 15+ 增量 LTO（-flto-incremental）
+    march: str = "native"        # 目标指令集（-march），留空则不指定；交叉编译或分布式编译时忽略 native
+    fast_math: bool = False      # 启用不严格遵循 IEEE 754 的浮点优化
     strip: bool = True           # 剥离符号
     
     # 调试选项
     debug: bool = False          # 调试模式
     keep_c_source: bool = False  # 保留生成的 C/C++ 源码
     
+    # 并行选项
+    jobs: int = 0                # 并行任务数，0 表示 CPU 核心数
+    single_shot: bool = False    # 编译与链接合并为一次编译器调用（不生成 .o，适合小项目）
+    
+    # 缓存选项
+    use_ccache: bool = True      # 通过 ccache/sccache 调用编译器（如已安装）
+    object_cache: bool = True    # 内置目标文件缓存（不依赖 ccache）
+    distributor: str = ""        # 分布式编译前缀，如 "distcc" / "icecc"
+    hardlink_runtime: bool = True  # 运行时依赖/标准库优先硬链接（同一文件系统时无需复制数据）
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
@@ -73,9 +158,19 @@ class CompilerConfig:
             'embed_python': self.embed_python,
             'python_static': self.python_static,
             'lto': self.lto,
+            'thin_lto': self.thin_lto,
+            'incremental_lto': self.incremental_lto,
+            'march': self.march,
+            'fast_math': self.fast_math,
             'strip': self.strip,
             'debug': self.debug,
             'keep_c_source': self.keep_c_source,
+            'jobs': self.jobs,
+            'single_shot': self.single_shot,
+            'use_ccache': self.use_ccache,
+            'object_cache': self.object_cache,
+            'distributor': self.distributor,
+            'hardlink_runtime': self.hardlink_runtime,
         }
     
     @classmethod
@@ -83,7 +178,8 @@ class CompilerConfig:
         """从字典创建"""
         valid_fields = {'mode', 'cc', 'cxx', 'c_flags', 'cxx_flags', 'link_flags',
                         'output_dll', 'output_exe', 'output_static', 'embed_python',
-                        'python_static', 'lto', 'strip', 'debug', 'keep_c_source'}
+                        'python_static', 'lto', 'thin_lto', 'incremental_lto', 'march', 'fast_math', 'strip', 'debug', 'keep_c_source', 'jobs', 'single_shot',
+                        'use_ccache', 'object_cache', 'distributor', 'hardlink_runtime'}
         filtered = {k: v for k, v in data.items() if k in valid_fields}
         return cls(**filtered)
 
@@ -92,8 +188,9 @@ class PythonInfo:
     """Python 环境信息"""
     
     def __init__(self):
-        self.version = f"{sys.version_info.major}.{sys.version_info.minor}"
-        self.version_full = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+        major, minor, micro = sys.version_info[:3]
+        self.version = f"{major}.{minor}"
+        self.version_full = f"{major}.{minor}.{micro}"
         self.executable = sys.executable
         self.prefix = sys.prefix
         self.base_prefix = sys.base_prefix
@@ -101,26 +198,83 @@ class PythonInfo:
         # 获取编译相关路径
         self._detect_paths()
     
+    @classmethod
+    def get_instance(cls) -> 'PythonInfo':
+        """获取共享实例（解释器环境在进程内不变，只检测一次）"""
+        global _PYTHON_INFO
+        if _PYTHON_INFO is None:
+            _PYTHON_INFO = cls()
+        return _PYTHON_INFO
+    
     def _detect_paths(self):
         """检测 Python 开发路径"""
         import sysconfig
         
-        self.include_dir = sysconfig.get_path('include')
-        self.stdlib_dir = sysconfig.get_path('stdlib')
+        major, minor = sys.version_info[:2]
+        paths = sysconfig.get_paths()
+        self.include_dir = paths['include']
+        self.stdlib_dir = paths['stdlib']
+        
+        libdir, ldlibrary, cflags, ldflags = sysconfig.get_config_vars(
+            'LIBDIR', 'LDLIBRARY', 'CFLAGS', 'LDFLAGS'
+        )
         
         # 获取链接库路径
         if sys.platform == 'win32':
             self.lib_dir = Path(sys.prefix) / 'libs'
-            self.lib_name = f"python{sys.version_info.major}{sys.version_info.minor}"
-            self.dll_name = f"python{sys.version_info.major}{sys.version_info.minor}.dll"
+            self.lib_name = f"python{major}{minor}"
+            self.dll_name = f"python{major}{minor}.dll"
         else:
-            self.lib_dir = Path(sysconfig.get_config_var('LIBDIR') or '/usr/lib')
-            self.lib_name = sysconfig.get_config_var('LDLIBRARY') or f"python{self.version}"
+            self.lib_dir = Path(libdir or '/usr/lib')
+            self.lib_name = ldlibrary or f"python{self.version}"
             self.dll_name = f"libpython{self.version}.so"
         
         # 获取编译标志
-        self.cflags = sysconfig.get_config_var('CFLAGS') or ''
-        self.ldflags = sysconfig.get_config_var('LDFLAGS') or ''
+        self.cflags = cflags or ''
+        self.ldflags = ldflags or ''
+
+
+_PYTHON_INFO: Optional[PythonInfo] = None
+
+
+class BuildArtifactCache:
+    """
+    构建产物缓存（内容寻址）
+
+    以输入内容和所有影响结果的选项为键，命中时直接复制缓存文件：
+    用于 Python → C/C++ 转换结果（跳过 Cython）和目标文件（跳过编译器）。
+    缓存位于输出目录下，跨构建保留。
+    """
+    
+    def __init__(self, cache_dir: Path, suffix: str):
+        self.cache_dir = cache_dir
+        self.suffix = suffix
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def make_key(source: bytes, *options: str) -> str:
+        """生成缓存键：输入内容 + 选项"""
+        h = hashlib.sha256(source)
+        for option in options:
+            h.update(b'\0')
+            h.update(option.encode('utf-8'))
+        return h.hexdigest()
+    
+    def fetch(self, key: str, dest: Path) -> bool:
+        """命中时将缓存文件复制到 dest 并返回 True"""
+        cached = self.cache_dir / f"{key}{self.suffix}"
+        try:
+            shutil.copyfile(cached, dest)
+        except FileNotFoundError:
+            return False
+        return True
+    
+    def store(self, key: str, src: Path):
+        """保存构建产物（先写临时文件再替换，避免留下不完整的缓存）"""
+        cached = self.cache_dir / f"{key}{self.suffix}"
+        tmp = cached.with_name(f"{cached.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, cached)
 
 
 class NativeCompiler:
@@ -142,13 +296,29 @@ class NativeCompiler:
         self.logger = get_logger("sikuwa.compiler", level=log_level)
         
         # Python 环境信息
-        self.python_info = PythonInfo()
+        self.python_info = PythonInfo.get_instance()
         
         # 工作目录
         self.work_dir: Optional[Path] = None
         self.c_source_dir: Optional[Path] = None
         self.obj_dir: Optional[Path] = None
         self.output_dir: Optional[Path] = None
+        self.platform: Optional[str] = None
+        self.codegen_cache: Optional[BuildArtifactCache] = None
+        self.object_cache: Optional[BuildArtifactCache] = None
+        self.lto_cache_dir: Optional[Path] = None
+        
+        # 并行任务数（Cython / GCC 均为子进程，线程池即可并行）
+        self.jobs = config.jobs or os.cpu_count() or 1
+        
+        # 编译器缓存包装（ccache / sccache），调试模式下不使用
+        self._cc_prefix: List[str] = self._detect_compiler_cache()
+        self._cc_env: Optional[Dict[str, str]] = None
+        
+        # 分布式编译：与 ccache 同用时通过 CCACHE_PREFIX 串联（见 _setup_work_dirs），
+        # sccache 自带分布式编译，不再叠加
+        if config.distributor and not self._cc_prefix:
+            self._cc_prefix = [config.distributor]
         
         self.logger.info_operation("=" * 70)
         self.logger.info_operation(_("初始化原生编译器"))
@@ -157,6 +327,18 @@ class NativeCompiler:
         self.logger.debug_config(f"C {_('编译器')}: {config.cc}")
         self.logger.debug_config(f"C++ {_('编译器')}: {config.cxx}")
         self.logger.debug_config(f"{_('编译模式')}: {config.mode}")
+        if self._cc_prefix:
+            self.logger.debug_config(f"{_('编译器包装')}: {self._cc_prefix[0]}")
+    
+    def _detect_compiler_cache(self) -> List[str]:
+        """检测可用的编译器缓存工具"""
+        if not self.config.use_ccache or self.config.debug:
+            return []
+        for tool in ("ccache", "sccache"):
+            path = shutil.which(tool)
+            if path:
+                return [path]
+        return []
     
     def compile_project(
         self,
@@ -192,10 +374,15 @@ class NativeCompiler:
                 self.logger.info_operation(f"  [OK] {_('生成')} {len(c_files)} {_('个 C/C++ 文件')}")
                 
                 # Step 4: C/C++ → 目标文件
-                self.logger.info_operation(f"\n[2/4] C/C++ → {_('目标文件')}...")
-                with PerfTimer("C/C++ → .o", self.logger):
-                    obj_files = self._compile_c_files(c_files)
-                self.logger.info_operation(f"  [OK] {_('生成')} {len(obj_files)} {_('个目标文件')}")
+                if self.config.single_shot:
+                    # 源文件直接作为链接输入，由编译器驱动一次完成编译与链接
+                    self.logger.info_operation(f"\n[2/4] {_('编译与链接合并执行')}")
+                    obj_files = self._single_shot_inputs(c_files)
+                else:
+                    self.logger.info_operation(f"\n[2/4] C/C++ → {_('目标文件')}...")
+                    with PerfTimer("C/C++ → .o", self.logger):
+                        obj_files = self._compile_c_files(c_files)
+                    self.logger.info_operation(f"  [OK] {_('生成')} {len(obj_files)} {_('个目标文件')}")
                 
                 # Step 5: 链接生成 dll/so
                 if self.config.output_dll:
@@ -233,6 +420,7 @@ class NativeCompiler:
     def _setup_work_dirs(self, output_dir: Path, platform: str):
         """设置工作目录"""
         self.output_dir = output_dir / f"native-{platform}"
+        self.platform = platform
         self.work_dir = output_dir / f".native_build_{platform}"
         self.c_source_dir = self.work_dir / "c_source"
         self.obj_dir = self.work_dir / "obj"
@@ -240,14 +428,35 @@ class NativeCompiler:
         for d in [self.output_dir, self.work_dir, self.c_source_dir, self.obj_dir]:
             d.mkdir(parents=True, exist_ok=True)
             self.logger.trace_io(f"  {_('创建目录')}: {d}")
+        
+        # 转换缓存放在工作目录之外，不随 _cleanup 删除
+        self.codegen_cache = BuildArtifactCache(output_dir / ".sikuwa_cache" / "codegen", ".c")
+        if self.config.object_cache:
+            self.object_cache = BuildArtifactCache(output_dir / ".sikuwa_cache" / "objects", ".o")
+        self.lto_cache_dir = output_dir / ".sikuwa_cache" / "lto"
+        
+        # ccache 目录同样放在输出目录下；用户已配置的 CCACHE_* 优先
+        if self._cc_prefix and Path(self._cc_prefix[0]).stem == "ccache":
+            env = dict(os.environ)
+            env.setdefault("CCACHE_DIR", str(output_dir / ".sikuwa_cache" / "ccache"))
+            env.setdefault("CCACHE_COMPRESS", "1")
+            env.setdefault("CCACHE_MAXSIZE", "5G")
+            if self.config.distributor:
+                env.setdefault("CCACHE_PREFIX", self.config.distributor)
+            self._cc_env = env
     
     def _collect_python_files(self, src_dir: Path) -> List[Path]:
         """收集 Python 源文件"""
         py_files = []
-        for py_file in src_dir.rglob("*.py"):
-            if py_file.is_file() and '__pycache__' not in str(py_file):
-                py_files.append(py_file)
-                self.logger.trace_io(f"  + {py_file.relative_to(src_dir)}")
+        for dirpath, dirnames, filenames in os.walk(src_dir):
+            # 原地剪枝，整棵 __pycache__ 子树都不进入
+            if '__pycache__' in dirnames:
+                dirnames.remove('__pycache__')
+            for name in filenames:
+                if name.endswith('.py'):
+                    py_file = Path(dirpath, name)
+                    py_files.append(py_file)
+                    self.logger.trace_io(f"  + {py_file.relative_to(src_dir)}")
         return py_files
     
     def _python_to_c(
@@ -264,36 +473,60 @@ class NativeCompiler:
         Returns:
             List[Tuple[Path, bool]]: [(c_file_path, is_main), ...]
         """
-        c_files = []
         main_file = (src_dir / main_script).resolve()
         
         # 检查 Cython 是否可用
         try:
             import Cython
-            from Cython.Compiler import Main as CythonMain
-            from Cython.Compiler.Options import CompilationOptions
             cython_available = True
             self.logger.debug_config(f"Cython {_('版本')}: {Cython.__version__}")
         except ImportError:
             cython_available = False
             self.logger.warn_minor("Cython {_('未安装')}, {_('使用内置转换器')}")
         
-        for py_file in py_files:
+        # 缓存键需包含所有影响生成结果的选项
+        if cython_available:
+            converter = ("cython", _CODEGEN_FORMAT_VERSION, Cython.__version__, *self._cython_options())
+        else:
+            # 内置转换器嵌入 marshal 字节码，格式随 Python 版本变化
+            converter = ("builtin", _CODEGEN_FORMAT_VERSION, self.python_info.version_full)
+        
+        def lookup(py_file: Path) -> Tuple[Path, Path, bool, str, bool]:
             relative_path = py_file.relative_to(src_dir)
             c_file = self.c_source_dir / relative_path.with_suffix('.c')
             c_file.parent.mkdir(parents=True, exist_ok=True)
             
             is_main = py_file.resolve() == main_file
             
+            key = BuildArtifactCache.make_key(
+                py_file.read_bytes(), *converter, str(py_file), str(is_main))
+            cached = self.codegen_cache.fetch(key, c_file)
+            if cached:
+                self.logger.trace_io(f"  {py_file.name} → {c_file.name} ({_('缓存')})")
+            return py_file, c_file, is_main, key, cached
+        
+        # 先查缓存（文件读写，并行）；map 保持原有顺序
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            entries = list(executor.map(lookup, py_files))
+        
+        misses = [entry for entry in entries if not entry[4]]
+        if misses:
             if cython_available:
                 # 使用 Cython 转换
-                self._cython_compile(py_file, c_file)
+                self._cython_compile([(py_file, c_file) for py_file, c_file, *_rest in misses])
             else:
                 # 使用内置简易转换器
-                self._builtin_convert(py_file, c_file, is_main)
+                for py_file, c_file, is_main, _key, _cached in misses:
+                    self._builtin_convert(py_file, c_file, is_main)
             
-            c_files.append((c_file, is_main))
-            self.logger.trace_io(f"  {py_file.name} → {c_file.name}")
+            for py_file, c_file, _is_main, key, _cached in misses:
+                self.codegen_cache.store(key, c_file)
+                self.logger.trace_io(f"  {py_file.name} → {c_file.name}")
+        
+        c_files = [(c_file, is_main) for _py, c_file, is_main, _key, _cached in entries]
+        self.logger.debug_detail(
+            f"  {_('转换缓存')}: {len(entries) - len(misses)} {_('命中')}, {len(misses)} {_('未命中')}"
+        )
         
         # 生成主入口 C 文件（如果嵌入 Python）
         if self.config.embed_python:
@@ -302,36 +535,50 @@ class NativeCompiler:
         
         return c_files
     
-    def _cython_compile(self, py_file: Path, c_file: Path):
-        """使用 Cython 编译"""
-        cmd = [
-            sys.executable, "-m", "cython",
-            "-3",  # Python 3 语法
-            "--embed" if self.config.embed_python else "",
-            "-o", str(c_file),
-            str(py_file)
-        ]
-        cmd = [c for c in cmd if c]  # 移除空字符串
+    def _cython_options(self) -> List[str]:
+        """Cython 转换选项"""
+        options = ["-3"]  # Python 3 语法
+        if self.config.embed_python:
+            options.append("--embed")
+        return options
+    
+    def _cython_compile(self, pairs: List[Tuple[Path, Path]]):
+        """
+        使用 Cython 编译
         
-        self.logger.trace_io(f"Cython: {' '.join(cmd)}")
+        进程内调用 Cython 编译器，避免每个文件都启动解释器并重新导入 Cython；
+        Cython 编译器不可重入，多个文件时由进程池并行，每个进程只导入一次
+        """
+        embed = self.config.embed_python
+        py_paths = [str(py_file) for py_file, _c in pairs]
+        c_paths = [str(c_file) for _py, c_file in pairs]
+        
+        workers = min(self.jobs, len(pairs))
+        if workers <= 1:
+            errors = list(map(_cython_worker, py_paths, c_paths, repeat(embed)))
+        else:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     initializer=_cython_worker_init) as executor:
+                errors = list(executor.map(_cython_worker, py_paths, c_paths, repeat(embed)))
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            self.logger.error_minimal(f"Cython {_('转换失败')}: {py_file}")
-            self.logger.debug_detail(result.stderr)
-            raise RuntimeError(f"Cython failed: {result.stderr}")
+        for (py_file, _c), error in zip(pairs, errors):
+            if error is not None:
+                self.logger.error_minimal(f"Cython {_('转换失败')}: {py_file}")
+                self.logger.debug_detail(error)
+                raise RuntimeError(f"Cython failed: {error}")
     
     def _builtin_convert(self, py_file: Path, c_file: Path, is_main: bool):
         """
         内置简易转换器 - 生成 C 包装代码
         
-        这是一个简化的方案：将 Python 代码作为字符串嵌入到 C 程序中，
-        运行时通过 Python C API 执行
+        这是一个简化的方案：构建时将 Python 代码编译为字节码，以 marshal 数据
+        嵌入到 C 程序中，运行时通过 Python C API 加载执行（无需再解析源码）
         """
-        py_code = py_file.read_text(encoding='utf-8')
+        py_code = py_file.read_bytes().decode('utf-8')
         
-        # 转义字符串
-        escaped_code = py_code.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n"\n"')
+        # 构建时编译，语法错误在此暴露；marshal 格式与链接的 Python 版本一致
+        code_bytes = marshal.dumps(compile(py_code, py_file.name, 'exec'))
+        code_array = ",".join(map(str, code_bytes))
         
         module_name = py_file.stem
         
@@ -341,15 +588,15 @@ class NativeCompiler:
 
 #define PY_SSIZE_T_CLEAN
 #include <Python.h>
+#include <marshal.h>
 
-static const char* {module_name}_source = 
-"{escaped_code}";
+static const unsigned char {module_name}_code[] = {{{code_array}}};
 
 PyObject* PyInit_{module_name}(void) {{
     PyObject* module = PyModule_Create(&{module_name}_def);
     if (module == NULL) return NULL;
     
-    PyObject* code = Py_CompileString({module_name}_source, "{py_file.name}", Py_file_input);
+    PyObject* code = PyMarshal_ReadObjectFromString((const char*){module_name}_code, sizeof({module_name}_code));
     if (code == NULL) {{
         Py_DECREF(module);
         return NULL;
@@ -376,7 +623,7 @@ static PyModuleDef {module_name}_def = {{
 }};
 '''
         
-        c_file.write_text(c_code, encoding='utf-8')
+        c_file.write_bytes(c_code.encode('utf-8'))
     
     def _generate_main_wrapper(self, main_script: str, src_dir: Path) -> Path:
         """生成主入口 C 包装文件"""
@@ -384,12 +631,12 @@ static PyModuleDef {module_name}_def = {{
         
         # 读取主脚本
         main_py = src_dir / main_script
-        main_code = main_py.read_text(encoding='utf-8')
-        escaped_code = main_code.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n"\n"')
+        main_code = main_py.read_bytes().decode('utf-8')
+        escaped_code = _c_string_body(main_code)
         
         c_code = f'''
 /* Sikuwa Native Compiler - Main Entry Point */
-/* Generated: {datetime.now().isoformat()} */
+/* Source: {main_py.name} */
 
 #define PY_SSIZE_T_CLEAN
 #include <Python.h>
@@ -471,6 +718,13 @@ int main(int argc, char* argv[]) {{
     PyList_Insert(sys_path, 0, exe_dir_obj);
     Py_DECREF(exe_dir_obj);
     
+    /* 打包的标准库 zip 作为后备搜索路径 */
+    char stdlib_zip[4096];
+    snprintf(stdlib_zip, sizeof(stdlib_zip), "%s%s{STDLIB_ZIP_NAME}", exe_dir, PATH_SEP);
+    PyObject* stdlib_zip_obj = PyUnicode_FromString(stdlib_zip);
+    PyList_Append(sys_path, stdlib_zip_obj);
+    Py_DECREF(stdlib_zip_obj);
+    
     /* 执行主程序 */
     int result = PyRun_SimpleString(main_source);
     
@@ -486,53 +740,232 @@ int main(int argc, char* argv[]) {{
 }}
 '''
         
-        main_c.write_text(c_code, encoding='utf-8')
-        self.logger.debug_detail(f"{_('生成主入口文件')}: {main_c}")
+        # 内容未变时不重写，保持 mtime 与下游编译缓存有效
+        data = c_code.encode('utf-8')
+        try:
+            unchanged = main_c.read_bytes() == data
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged:
+            self.logger.debug_detail(f"{_('主入口文件未变化')}: {main_c}")
+        else:
+            main_c.write_bytes(data)
+            self.logger.debug_detail(f"{_('生成主入口文件')}: {main_c}")
         
         return main_c
     
     def _compile_c_files(self, c_files: List[Tuple[Path, bool]]) -> List[Path]:
-        """编译 C/C++ 文件为目标文件"""
-        obj_files = []
+        """编译 C/C++ 文件为目标文件（并行）"""
+        # 与源文件无关的命令前缀只构建一次
+        c_cmd = self._base_compile_cmd(self.config.cc, self.config.c_flags)
+        cxx_cmd = self._base_compile_cmd(self.config.cxx, self.config.cxx_flags)
         
-        for c_file, is_main in c_files:
-            obj_file = self.obj_dir / c_file.with_suffix('.o').name
-            
-            # 选择编译器
-            if c_file.suffix in ['.cpp', '.cxx', '.cc']:
-                compiler = self.config.cxx
-                flags = self.config.cxx_flags.copy()
-            else:
-                compiler = self.config.cc
-                flags = self.config.c_flags.copy()
-            
-            # 添加 Python 头文件路径
-            flags.append(f"-I{self.python_info.include_dir}")
-            
-            # 调试模式
-            if self.config.debug:
-                flags.extend(["-g", "-O0"])
-            
-            # 构建命令
-            cmd = [compiler] + flags + ["-c", str(c_file), "-o", str(obj_file)]
-            
-            self.logger.trace_io(f"  {c_file.name} → {obj_file.name}")
-            if self.verbose:
-                self.logger.debug_detail(f"  $ {' '.join(cmd)}")
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                self.logger.error_minimal(f"{_('编译失败')}: {c_file.name}")
-                self.logger.debug_detail(result.stderr)
-                raise RuntimeError(f"Compilation failed: {c_file.name}\n{result.stderr}")
+        # 目标文件缓存键中的编译选项部分（不含包装前缀和文件路径）
+        skip = len(self._cc_prefix)
+        headers = self._header_fingerprint()
+        c_options = (*c_cmd[skip:], self._compiler_id(self.config.cc), headers)
+        cxx_options = (*cxx_cmd[skip:], self._compiler_id(self.config.cxx), headers)
+        
+        tasks = []
+        options = {}
+        for c_file, _is_main in c_files:
+            is_cxx = c_file.suffix in ('.cpp', '.cxx', '.cc')
+            base_cmd = cxx_cmd if is_cxx else c_cmd
+            # 按源码相对路径存放，避免不同包下的同名模块（如 __init__）互相覆盖
+            try:
+                obj_file = self.obj_dir / c_file.relative_to(self.c_source_dir).with_suffix('.o')
+            except ValueError:
+                obj_file = self.obj_dir / c_file.with_suffix('.o').name
+            obj_file.parent.mkdir(parents=True, exist_ok=True)
+            tasks.append((c_file, obj_file, [*base_cmd, "-c", str(c_file), "-o", str(obj_file)]))
+            options[c_file] = cxx_options if is_cxx else c_options
+        
+        self._write_compile_commands(tasks)
+        
+        def compile_one(task: Tuple[Path, Path, List[str]]) -> Path:
+            c_file, obj_file, cmd = task
+            if self.object_cache is None:
+                return self._compile_c_file(c_file, obj_file, cmd)
             
-            obj_files.append(obj_file)
+            key = BuildArtifactCache.make_key(c_file.read_bytes(), *options[c_file])
+            if self.object_cache.fetch(key, obj_file):
+                self.logger.trace_io(f"  {c_file.name} → {obj_file.name} ({_('缓存')})")
+                return obj_file
+            self._compile_c_file(c_file, obj_file, cmd)
+            self.object_cache.store(key, obj_file)
+            return obj_file
+        
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            return list(executor.map(compile_one, tasks))
+    
+    def _compiler_id(self, compiler: str) -> str:
+        """编译器标识（路径 + mtime），编译器升级后目标文件缓存随之失效"""
+        path = shutil.which(compiler)
+        if path is None:
+            return compiler
+        try:
+            return f"{path}:{os.stat(path).st_mtime_ns}"
+        except OSError:
+            return path
+    
+    def _header_fingerprint(self) -> str:
+        """
+        Python 头文件标识（版本 + 头文件目录下各 .h 的路径、mtime、大小）
+        
+        同一路径下的 Python 升级（如补丁版本）后目标文件缓存随之失效，避免链接按旧 ABI 编译的目标文件
+        """
+        h = hashlib.sha256(self.python_info.version_full.encode('utf-8'))
+        include_dir = Path(self.python_info.include_dir)
+        try:
+            headers = sorted(include_dir.rglob('*.h'))
+        except OSError:
+            headers = []
+        for header in headers:
+            try:
+                st = header.stat()
+            except OSError:
+                continue
+            h.update(f"\0{header.relative_to(include_dir)}:{st.st_mtime_ns}:{st.st_size}".encode('utf-8'))
+        return h.hexdigest()
+    
+    def _write_compile_commands(self, tasks: List[Tuple[Path, Path, List[str]]]):
+        """
+        输出 compile_commands.json（JSON 编译数据库）
+        
+        供 IDE、Bear 兼容工具及 distcc/icecc 等分布式编译使用；
+        记录的命令不含 ccache 等包装前缀
+        """
+        skip = len(self._cc_prefix)
+        entries = [
+            {
+                # 命令中的文件与 -I 路径相对于当前工作目录
+                "directory": os.getcwd(),
+                "file": str(c_file),
+                "output": str(obj_file),
+                "arguments": cmd[skip:],
+            }
+            for c_file, obj_file, cmd in tasks
+        ]
+        db_file = self.work_dir / "compile_commands.json"
+        db_file.write_text(json.dumps(entries, indent=2, ensure_ascii=False), encoding='utf-8')
+        self.logger.trace_io(f"  {_('编译数据库')}: {db_file}")
+    
+    def _base_compile_cmd(self, compiler: str, flags: List[str]) -> Tuple[str, ...]:
+        """编译命令中与源文件无关的部分"""
+        cmd = [*self._cc_prefix, compiler, *flags]
+        
+        # 添加 Python 头文件路径
+        cmd.append(f"-I{self.python_info.include_dir}")
+        
+        # 调试模式
+        if self.config.debug:
+            cmd.extend(["-g", "-O0"])
+        
+        # 各阶段之间用管道代替临时文件
+        if Path(compiler).stem.lower() != "cl":
+            cmd.append("-pipe")
+        
+        # 指令集与浮点优化
+        cmd.extend(self._arch_flags(compiler))
+        
+        # LTO：编译阶段生成带中间表示的目标文件
+        cmd.extend(self._lto_flags(compiler))
+        
+        return tuple(cmd)
+    
+    def _single_shot_inputs(self, c_files: List[Tuple[Path, bool]]) -> List[str]:
+        """单次调用模式的链接输入：C 编译选项 + 源文件（此模式由 C 编译器驱动链接）"""
+        base_cmd = self._base_compile_cmd(self.config.cc, self.config.c_flags)
+        flags = list(base_cmd[len(self._cc_prefix) + 1:])
+        return [*flags, *(str(c_file) for c_file, _is_main in c_files)]
+    
+    def _compile_c_file(self, c_file: Path, obj_file: Path, cmd: List[str]) -> Path:
+        """编译单个 C/C++ 文件"""
+        self.logger.trace_io(f"  {c_file.name} → {obj_file.name}")
+        if self.verbose:
+            self.logger.debug_detail(f"  $ {' '.join(cmd)}")
+        
+        returncode, output = self._run(cmd, env=self._cc_env)
+        if returncode != 0:
+            self.logger.error_minimal(f"{_('编译失败')}: {c_file.name}")
+            raise RuntimeError(f"Compilation failed: {c_file.name}\n{output}")
+        
+        return obj_file
+    
+    def _run(self, cmd: List[str], env: Optional[Dict[str, str]] = None) -> Tuple[int, str]:
+        """
+        执行编译/链接命令，返回 (返回码, 输出)
+        
+        详细模式下逐行转发到日志（仅保留末尾部分用于报错），
+        否则丢弃 stdout，只收集 stderr
+        """
+        if not self.verbose:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    text=True, env=env)
+            return result.returncode, result.stderr
+        
+        tail = deque(maxlen=200)
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              text=True, env=env) as proc:
+            for line in proc.stdout:
+                line = line.rstrip('\n')
+                self.logger.debug_detail(f"    {line}")
+                tail.append(line)
+        return proc.returncode, "\n".join(tail)
+    
+    def _arch_flags(self, compiler: str) -> List[str]:
+        """-march 与 fast-math 选项（MSVC 不启用）"""
+        if Path(compiler).stem.lower() == "cl":
+            return []
+        
+        flags = []
+        march = self.config.march
+        # native 只对本机有效：交叉编译或分布式编译（远程主机按各自 CPU 生成指令）时跳过
+        if march == "native" and (
+                self.config.distributor
+                or (self.platform and self.platform != _host_platform())):
+            march = ""
+        if march:
+            flags.append(f"-march={march}")
+        
+        if self.config.fast_math:
+            flags.extend([
+                "-fassociative-math", "-ffinite-math-only",
+                "-freciprocal-math", "-funsafe-math-optimizations",
+            ])
+        return flags
+    
+    def _lto_flags(self, compiler: str, link: bool = False) -> List[str]:
+        """LTO 编译/链接选项（调试模式及 MSVC 不启用）"""
+        if not self.config.lto or self.config.debug:
+            return []
         
-        return obj_files
+        name = Path(compiler).stem.lower()
+        if name == "cl":
+            return []
+        if "clang" in name:
+            if not self.config.thin_lto:
+                return ["-flto"]
+            flags = ["-flto=thin"]
+            if link and self.config.jobs:
+                flags.append(f"-flto-jobs={self.jobs}")
+            return flags
+        
+        # -flto=auto：在 make 下使用 jobserver，否则按 CPU 核数并行 LTRANS；
+        # 显式指定 jobs 时以其为准
+        flags = [f"-flto={self.jobs}" if self.config.jobs else "-flto=auto"]
+        if link:
+            flags.append("-fuse-linker-plugin")
+            if self.jobs > 1:
+                flags.append("-flto-partition=balanced")
+            if self.config.incremental_lto:
+                self.lto_cache_dir.mkdir(parents=True, exist_ok=True)
+                flags.append(f"-flto-incremental={self.lto_cache_dir}")
+        return flags
     
     def _link_shared_library(
         self,
-        obj_files: List[Path],
+        obj_files: List[Union[Path, str]],
         project_name: str,
         platform: str
     ) -> Path:
@@ -551,8 +984,8 @@ int main(int argc, char* argv[]) {{
         
         dll_path = self.output_dir / dll_name
         
-        # 选择链接器
-        linker = self.config.cxx  # 使用 C++ 链接器
+        # 选择链接器（单次调用模式下输入为 C 源文件，用 C 编译器驱动）
+        linker = self.config.cc if self.config.single_shot else self.config.cxx
         
         # 构建链接命令
         link_flags = self.config.link_flags.copy()
@@ -567,8 +1000,7 @@ int main(int argc, char* argv[]) {{
         link_flags.append(f"-l{self.python_info.lib_name}")
         
         # LTO 优化
-        if self.config.lto:
-            link_flags.append("-flto")
+        link_flags.extend(self._lto_flags(linker, link=True))
         
         # 剥离符号
         if self.config.strip and not self.config.debug:
@@ -578,17 +1010,16 @@ int main(int argc, char* argv[]) {{
         
         self.logger.debug_detail(f"$ {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
+        returncode, output = self._run(cmd)
+        if returncode != 0:
             self.logger.error_minimal(f"{_('链接失败')}: {dll_name}")
-            self.logger.debug_detail(result.stderr)
-            raise RuntimeError(f"Linking failed: {dll_name}\n{result.stderr}")
+            raise RuntimeError(f"Linking failed: {dll_name}\n{output}")
         
         return dll_path
     
     def _link_executable(
         self,
-        obj_files: List[Path],
+        obj_files: List[Union[Path, str]],
         project_name: str,
         platform: str
     ) -> Path:
@@ -602,8 +1033,8 @@ int main(int argc, char* argv[]) {{
         
         exe_path = self.output_dir / exe_name
         
-        # 选择链接器
-        linker = self.config.cxx
+        # 选择链接器（单次调用模式下输入为 C 源文件，用 C 编译器驱动）
+        linker = self.config.cc if self.config.single_shot else self.config.cxx
         
         # 构建链接命令
         link_flags = self.config.link_flags.copy()
@@ -621,8 +1052,7 @@ int main(int argc, char* argv[]) {{
             link_flags.extend(["-lpthread", "-ldl", "-lutil", "-lm"])
         
         # LTO 优化
-        if self.config.lto:
-            link_flags.append("-flto")
+        link_flags.extend(self._lto_flags(linker, link=True))
         
         # 剥离符号
         if self.config.strip and not self.config.debug:
@@ -632,11 +1062,10 @@ int main(int argc, char* argv[]) {{
         
         self.logger.debug_detail(f"$ {' '.join(cmd)}")
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
+        returncode, output = self._run(cmd)
+        if returncode != 0:
             self.logger.error_minimal(f"{_('链接失败')}: {exe_name}")
-            self.logger.debug_detail(result.stderr)
-            raise RuntimeError(f"Linking failed: {exe_name}\n{result.stderr}")
+            raise RuntimeError(f"Linking failed: {exe_name}\n{output}")
         
         return exe_path
     
@@ -649,60 +1078,141 @@ int main(int argc, char* argv[]) {{
                 python_dll = Path(sys.prefix) / self.python_info.dll_name
                 if python_dll.exists():
                     dest = self.output_dir / python_dll.name
-                    shutil.copy2(python_dll, dest)
+                    self._copy_runtime_file(python_dll, dest)
                     self.logger.trace_io(f"  {_('复制')}: {python_dll.name}")
                 
                 # 复制 vcruntime
                 vcruntime = Path(sys.prefix) / "vcruntime140.dll"
                 if vcruntime.exists():
-                    shutil.copy2(vcruntime, self.output_dir / vcruntime.name)
+                    self._copy_runtime_file(vcruntime, self.output_dir / vcruntime.name)
                     self.logger.trace_io(f"  {_('复制')}: vcruntime140.dll")
             
             elif platform == 'linux':
                 python_so = self.python_info.lib_dir / self.python_info.dll_name
                 if python_so.exists():
                     dest = self.output_dir / python_so.name
-                    shutil.copy2(python_so, dest)
+                    self._copy_runtime_file(python_so, dest)
                     self.logger.trace_io(f"  {_('复制')}: {python_so.name}")
         
         # 复制标准库 (如果嵌入 Python)
         if self.config.embed_python:
             self._copy_stdlib(platform)
     
+    def _copy_runtime_file(self, src, dst):
+        """
+        复制运行时文件
+        
+        启用 hardlink_runtime 时优先硬链接，跨文件系统或无权限时回退为复制。
+        目标已存在时先删除，避免写穿上次构建留下的硬链接
+        """
+        if os.path.lexists(dst):
+            os.unlink(dst)
+        if self.config.hardlink_runtime:
+            try:
+                os.link(src, dst)
+                return dst
+            except OSError:
+                pass
+        return shutil.copy2(src, dst)
+    
     def _copy_stdlib(self, platform: str):
         """复制 Python 标准库"""
-        stdlib_dest = self.output_dir / "python_lib"
-        stdlib_dest.mkdir(exist_ok=True)
-        
         # 复制 zip 格式的标准库 (如果存在)
         if platform == 'windows':
             stdlib_zip = Path(sys.prefix) / f"python{self.python_info.version.replace('.', '')}.zip"
             if stdlib_zip.exists():
-                shutil.copy2(stdlib_zip, self.output_dir / stdlib_zip.name)
+                self._copy_runtime_file(stdlib_zip, self.output_dir / stdlib_zip.name)
                 self.logger.trace_io(f"  {_('复制')}: {stdlib_zip.name}")
                 return
         
-        # 复制关键标准库模块
+        # 关键标准库模块打包为单个 zip（不压缩），运行时由 zipimport 加载
         essential_modules = [
             'os.py', 'sys.py', 'io.py', 'abc.py', 'functools.py',
             'collections', 'encodings', 'importlib'
         ]
         
         stdlib_src = Path(self.python_info.stdlib_dir)
-        for module in essential_modules:
-            src = stdlib_src / module
-            if src.exists():
+        stdlib_zip = self.output_dir / STDLIB_ZIP_NAME
+        tmp_zip = stdlib_zip.with_name(stdlib_zip.name + ".tmp")
+        with zipfile.ZipFile(tmp_zip, 'w', compression=zipfile.ZIP_STORED) as zf:
+            for module in essential_modules:
+                src = stdlib_src / module
                 if src.is_dir():
-                    shutil.copytree(src, stdlib_dest / module, dirs_exist_ok=True)
+                    for dirpath, dirnames, filenames in os.walk(src):
+                        if '__pycache__' in dirnames:
+                            dirnames.remove('__pycache__')
+                        for name in filenames:
+                            path = os.path.join(dirpath, name)
+                            zf.write(path, os.path.relpath(path, stdlib_src))
+                elif src.is_file():
+                    zf.write(src, module)
                 else:
-                    shutil.copy2(src, stdlib_dest / module)
-                self.logger.trace_io(f"  {_('复制')}: {module}")
+                    continue
+                self.logger.trace_io(f"  {_('打包')}: {module}")
+        os.replace(tmp_zip, stdlib_zip)
     
     def _cleanup(self):
-        """清理临时文件"""
-        if self.work_dir and self.work_dir.exists():
+        """
+        清理临时文件
+        
+        先将工作目录改名（一次系统调用），再由后台线程删除，删除与构建后续步骤并行；
+        改名失败时（如 Windows 上文件被占用）同步删除
+        """
+        if not (self.work_dir and self.work_dir.exists()):
+            return
+        
+        trash = self.work_dir.with_name(f"{self.work_dir.name}.trash-{os.getpid()}")
+        try:
+            os.replace(self.work_dir, trash)
+        except OSError:
             shutil.rmtree(self.work_dir)
             self.logger.trace_io(f"  {_('清理')}: {self.work_dir}")
+            return
+        
+        # 顺带清除之前被中断的进程遗留的目录；非守护线程，解释器退出前会等待删除完成，
+        # 不会在输出目录中留下未删完的 C 源码与目标文件
+        stale = list(self.work_dir.parent.glob(f"{self.work_dir.name}.trash-*"))
+        threading.Thread(
+            target=lambda: [shutil.rmtree(d, ignore_errors=True) for d in stale],
+            name="sikuwa-cleanup",
+        ).start()
+        self.logger.trace_io(f"  {_('清理')}: {self.work_dir}")
+
+
+def _host_platform() -> str:
+    """当前主机平台（与 build 的 platform 参数同名）"""
+    if sys.platform == 'win32':
+        return 'windows'
+    if sys.platform == 'darwin':
+        return 'macos'
+    return 'linux'
+
+
+def _compiler_cache_file() -> Path:
+    """编译器探测结果缓存文件"""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(cache_home) / 'sikuwa' / 'compiler.json'
+
+
+def _probe_compiler(path: str, cache: Dict[str, Any]) -> bool:
+    """运行 --version 确认编译器可用，结果按可执行文件路径和 mtime 缓存"""
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return False
+    
+    entry = cache.get(path)
+    if entry and entry.get('mtime_ns') == mtime_ns:
+        return entry['ok']
+    
+    try:
+        result = subprocess.run([path, '--version'], stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, timeout=5)
+        ok = result.returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        ok = False
+    cache[path] = {'mtime_ns': mtime_ns, 'ok': ok}
+    return ok
 
 
 def detect_compiler() -> Tuple[str, str]:
@@ -721,14 +1231,30 @@ def detect_compiler() -> Tuple[str, str]:
             ('clang', 'clang++'),
         ]
     
+    cache_file = _compiler_cache_file()
+    try:
+        cache = json.loads(cache_file.read_bytes())
+    except (OSError, ValueError):
+        cache = {}
+    cached = dict(cache)
+    
+    found = None
     for cc, cxx in compilers:
+        # 先做纯路径查找，未安装的编译器无需启动进程
+        path = shutil.which(cc)
+        if path and _probe_compiler(path, cache):
+            found = (cc, cxx)
+            break
+    
+    if cache != cached:
         try:
-            result = subprocess.run([cc, '--version'], capture_output=True, timeout=5)
-            if result.returncode == 0:
-                return cc, cxx
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            continue
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(cache), encoding='utf-8')
+        except OSError:
+            pass
     
+    if found:
+        return found
     raise RuntimeError("No C/C++ compiler found. Please install GCC, Clang, or MSVC.")
 
 
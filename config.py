@@ -5,10 +5,21 @@ Sikuwa 配置管理模块
 
 from __future__ import annotations
 
+import copy
+import os
 import sys
 from pathlib import Path
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
-from dataclasses import dataclass, field, asdict
+from typing import List, Optional, Dict, Any, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, field, fields
+
+# TOML 解析后端：优先使用原生实现 rtoml / pytomlpp，否则回退到 tomllib / tomli
+try:
+    import rtoml as _fast_toml
+except ImportError:
+    try:
+        import pytomlpp as _fast_toml
+    except ImportError:
+        _fast_toml = None
 
 # 修复 tomli 导入，避免 mypyc 问题
 if sys.version_info >= (3, 11):
@@ -17,14 +28,65 @@ else:
     try:
         import tomli as tomllib
     except ImportError:
-        raise ImportError(
-            "Python < 3.11 需要安装 tomli:\n"
-            "  pip install tomli\n"
-            "或升级到 Python 3.11+"
-        )
+        if _fast_toml is None:
+            raise ImportError(
+                "Python < 3.11 需要安装 tomli:\n"
+                "  pip install tomli\n"
+                "或升级到 Python 3.11+"
+            )
+        tomllib = None
 
 
-@dataclass
+def _toml_load(path: Path) -> Dict[str, Any]:
+    """使用可用的最快后端解析 TOML 文件（一次读入内存后再解析）"""
+    text = path.read_bytes().decode('utf-8')
+    if _fast_toml is not None:
+        return _fast_toml.loads(text)
+    return tomllib.loads(text)
+
+
+# Windows / macOS 默认文件系统不区分文件名大小写
+_CASE_INSENSITIVE_FS = sys.platform in ('win32', 'darwin')
+
+
+# from_toml 解析结果缓存：(绝对路径, mtime_ns, size) -> BuildConfig
+_TOML_CACHE: Dict[Tuple[str, int, int], 'BuildConfig'] = {}
+
+
+def clear_cache() -> None:
+    """清空配置文件解析缓存"""
+    _TOML_CACHE.clear()
+
+
+# 选项类使用 __slots__（Python 3.10+ 的 dataclass 才支持 slots 参数）
+if sys.version_info >= (3, 10):
+    _options_dataclass = dataclass(slots=True)
+else:
+    _options_dataclass = dataclass
+
+
+def _fast_from_dict(cls):
+    """
+    配置类装饰器：预先计算字段名，并生成 from_dict 类方法
+
+    from_dict(data) 忽略不存在的字段后创建实例；BuildConfig 的嵌套选项
+    以原始字典传入，由 _LazyOptions 在首次访问时构建。
+    """
+    names = tuple(f.name for f in fields(cls))
+    valid = frozenset(names)
+    cls._FIELD_NAMES = names
+    cls._VALID_FIELDS = valid
+    
+    def from_dict(klass, data: Dict[str, Any]):
+        """从字典创建"""
+        return klass(**{k: v for k, v in data.items() if k in valid})
+    
+    cls.from_dict = classmethod(from_dict)
+    return cls
+
+
+@_fast_from_dict
+@_options_dataclass
 class NuitkaOptions:
     """Nuitka 编译选项"""
     
@@ -66,27 +128,14 @@ class NuitkaOptions:
     extra_args: List[str] = field(default_factory=list)
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        data = asdict(self)
-        
+        """转换为字典（浅拷贝，列表与实例共享）"""
         # 过滤掉值为 None 的字段，避免 TOML 序列化错误
-        filtered_data = {}
-        for key, value in data.items():
-            if value is not None:
-                filtered_data[key] = value
-        
-        return filtered_data
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'NuitkaOptions':
-        """从字典创建"""
-        # 过滤掉不存在的字段
-        valid_fields = {f.name for f in cls.__dataclass_fields__.values()}
-        filtered_data = {k: v for k, v in data.items() if k in valid_fields}
-        return cls(**filtered_data)
+        values = ((name, getattr(self, name)) for name in self._FIELD_NAMES)
+        return {key: value for key, value in values if value is not None}
 
 
-@dataclass
+@_fast_from_dict
+@_options_dataclass
 class NativeCompilerOptions:
     """原生编译器选项 - Python → C/C++ → GCC/G++ → dll/so + exe"""
     
@@ -98,8 +147,8 @@ class NativeCompilerOptions:
     cxx: str = "g++"      # C++ 编译器
     
     # 编译选项
-    c_flags: List[str] = field(default_factory=lambda: ["-O2", "-fPIC"])
-    cxx_flags: List[str] = field(default_factory=lambda: ["-O2", "-fPIC", "-std=c++17"])
+    c_flags: List[str] = field(default_factory=lambda: ["-O3", "-fPIC", "-fno-semantic-interposition"])
+    cxx_flags: List[str] = field(default_factory=lambda: ["-O3", "-fPIC", "-fno-semantic-interposition", "-std=c++17"])
     link_flags: List[str] = field(default_factory=list)
     
     # 输出选项
@@ -112,25 +161,60 @@ class NativeCompilerOptions:
     python_static: bool = False  # 静态链接 Python
     
     # 优化选项
-    lto: bool = False            # Link Time Optimization
+    lto: bool = True             # Link Time Optimization（调试模式下不启用）
+    thin_lto: bool = False       # Clang 使用 ThinLTO
+    incremental_lto: bool = False  # GCC 15+ 增量 LTO（-flto-incremental）
+    march: str = "native"        # 目标指令集（-march），留空则不指定；交叉编译或分布式编译时忽略 native
+    fast_math: bool = False      # 启用不严格遵循 IEEE 754 的浮点优化
     strip: bool = True           # 剥离符号
     
     # 调试选项
     debug: bool = False          # 调试模式
     keep_c_source: bool = False  # 保留生成的 C/C++ 源码
     
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        return asdict(self)
+    # 编译流程
+    jobs: int = 0                # 并行任务数，0 表示 CPU 核心数
+    use_ccache: bool = True      # 通过 ccache/sccache 调用编译器（如已安装）
+    object_cache: bool = True    # 内置目标文件缓存（不依赖 ccache）
+    distributor: str = ""        # 分布式编译前缀，如 "distcc" / "icecc"
+    single_shot: bool = False    # 编译与链接合并为一次编译器调用（不生成 .o，适合小项目）
     
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'NativeCompilerOptions':
-        """从字典创建"""
-        valid_fields = {f.name for f in cls.__dataclass_fields__.values()}
-        filtered_data = {k: v for k, v in data.items() if k in valid_fields}
-        return cls(**filtered_data)
+    # 运行时依赖
+    hardlink_runtime: bool = True  # 运行时依赖/标准库优先硬链接（同一文件系统时无需复制数据）
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（浅拷贝，列表与实例共享）"""
+        return {name: getattr(self, name) for name in self._FIELD_NAMES}
+
 
+class _LazyOptions:
+    """
+    嵌套选项字段的描述符：可接收原始字典，首次访问时才构建选项对象
 
+    只读取 project_name 等基础字段的命令无需构建 Nuitka/原生编译器选项。
+    """
+    
+    def __init__(self, options_cls):
+        self.options_cls = options_cls
+    
+    def __set_name__(self, owner, name):
+        self.attr = f"_{name}"
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            # dataclass 以此作为字段默认值
+            return None
+        value = obj.__dict__[self.attr]
+        if not isinstance(value, self.options_cls):
+            value = self.options_cls.from_dict(value)
+            obj.__dict__[self.attr] = value
+        return value
+    
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = {} if value is None else value
+
+
+@_fast_from_dict
 @dataclass
 class BuildConfig:
     """Sikuwa 构建配置"""
@@ -153,11 +237,11 @@ class BuildConfig:
     # 编译模式选择: "nuitka" | "native"
     compiler_mode: str = "nuitka"
     
-    # Nuitka 选项 (compiler_mode="nuitka" 时使用)
-    nuitka_options: NuitkaOptions = field(default_factory=NuitkaOptions)
+    # Nuitka 选项 (compiler_mode="nuitka" 时使用)，可传入原始字典，首次访问时构建
+    nuitka_options: NuitkaOptions = _LazyOptions(NuitkaOptions)
     
-    # 原生编译器选项 (compiler_mode="native" 时使用)
-    native_options: NativeCompilerOptions = field(default_factory=NativeCompilerOptions)
+    # 原生编译器选项 (compiler_mode="native" 时使用)，同上
+    native_options: NativeCompilerOptions = _LazyOptions(NativeCompilerOptions)
     
     # 资源文件
     resources: List[str] = field(default_factory=list)
@@ -197,52 +281,40 @@ class BuildConfig:
                     raise ValueError(f"不支持的平台: {platform}，有效平台: {valid_platforms}")
             
             # 检查主脚本是否存在
-            main_file = Path(self.src_dir) / self.main_script
-            if not main_file.exists():
-                raise FileNotFoundError(f"主脚本不存在: {main_file}")
+            if not os.path.isfile(os.path.join(self.src_dir, self.main_script)):
+                raise FileNotFoundError(f"主脚本不存在: {Path(self.src_dir) / self.main_script}")
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典"""
-        data = asdict(self)
-        data['nuitka_options'] = self.nuitka_options.to_dict()
-        data['native_options'] = self.native_options.to_dict()
-        
+        """转换为字典（浅拷贝，列表与实例共享）"""
+        # 嵌套选项使用各自的 to_dict，其余字段直接读取；
         # 过滤掉值为 None 的字段，避免 TOML 序列化错误
-        filtered_data = {}
-        for key, value in data.items():
+        data = {}
+        for name in self._FIELD_NAMES:
+            value = getattr(self, name)
+            if name in ('nuitka_options', 'native_options'):
+                value = value.to_dict()
             if value is not None:
-                filtered_data[key] = value
-        
-        return filtered_data
-    
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'BuildConfig':
-        """从字典创建"""
-        # 提取 nuitka_options
-        nuitka_data = data.pop('nuitka_options', {})
-        nuitka_options = NuitkaOptions.from_dict(nuitka_data)
-        
-        # 提取 native_options
-        native_data = data.pop('native_options', {})
-        native_options = NativeCompilerOptions.from_dict(native_data)
-        
-        # 过滤掉不存在的字段
-        valid_fields = {f.name for f in cls.__dataclass_fields__.values()}
-        filtered_data = {k: v for k, v in data.items() if k in valid_fields}
-        
-        return cls(nuitka_options=nuitka_options, native_options=native_options, **filtered_data)
+                data[name] = value
+        return data
     
     @classmethod
     def from_toml(cls, config_file: str) -> 'BuildConfig':
         """从 TOML 文件加载配置"""
         config_path = Path(config_file)
         
-        if not config_path.exists():
+        try:
+            st = config_path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"配置文件不存在: {config_file}")
         
+        # 文件未变化时直接返回缓存副本，跳过解析
+        cache_key = (str(config_path.resolve()), st.st_mtime_ns, st.st_size)
+        cached = _TOML_CACHE.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
         try:
-            with open(config_path, 'rb') as f:
-                data = tomllib.load(f)
+            data = _toml_load(config_path)
         except Exception as e:
             raise ValueError(f"解析 TOML 文件失败: {e}")
         
@@ -259,8 +331,6 @@ class BuildConfig:
         if 'nuitka_options' in sikuwa_config:
             nuitka_data.update(sikuwa_config.pop('nuitka_options'))
         
-        nuitka_options = NuitkaOptions.from_dict(nuitka_data)
-        
         # 解析原生编译器选项
         native_data = sikuwa_config.pop('native', {})
         
@@ -268,11 +338,10 @@ class BuildConfig:
         if 'native_options' in sikuwa_config:
             native_data.update(sikuwa_config.pop('native_options'))
         
-        native_options = NativeCompilerOptions.from_dict(native_data)
-        
-        # 创建配置对象
-        config = cls(nuitka_options=nuitka_options, native_options=native_options, **sikuwa_config)
+        # 创建配置对象（嵌套选项保持原始字典，首次访问时才构建）
+        config = cls(nuitka_options=nuitka_data, native_options=native_data, **sikuwa_config)
         
+        _TOML_CACHE[cache_key] = copy.deepcopy(config)
         return config
     
     def save_to_toml(self, config_file: str) -> None:
@@ -319,31 +388,70 @@ class ConfigManager:
         ".sikuwa.toml"
     ]
     
+    # find_config 结果缓存：工作目录 -> (目录 mtime_ns, 配置文件路径)
+    _FIND_CACHE: Dict[str, Tuple[int, Path]] = {}
+    
     @staticmethod
     def find_config() -> Optional[Path]:
-        """自动查找配置文件"""
+        """自动查找配置文件（按工作目录缓存找到的结果，目录内容变化后重新查找）"""
+        cwd = os.getcwd()
+        # 新建、删除或改名文件都会更新目录 mtime，缓存的结果随之失效
+        try:
+            dir_mtime = os.stat('.').st_mtime_ns
+        except OSError:
+            dir_mtime = None
+        cached = ConfigManager._FIND_CACHE.get(cwd)
+        if cached is not None and dir_mtime is not None and cached[0] == dir_mtime:
+            return cached[1]
+        
+        # 一次读取目录项代替逐个 stat 候选文件
+        wanted = set(ConfigManager.DEFAULT_CONFIG_FILES)
+        try:
+            with os.scandir('.') as it:
+                present = {e.name for e in it if e.name in wanted and e.is_file()}
+        except OSError:
+            present = set()
+        
         for config_file in ConfigManager.DEFAULT_CONFIG_FILES:
-            config_path = Path(config_file)
-            if config_path.exists():
-                return config_path
+            # 目录项按名称精确匹配；大小写不敏感的文件系统上再按路径检查（如 Sikuwa.toml）
+            if config_file in present or (_CASE_INSENSITIVE_FS and Path(config_file).is_file()):
+                result = Path(config_file)
+                # 只缓存找到的结果，之后新建的配置文件仍能被找到
+                if dir_mtime is not None:
+                    ConfigManager._FIND_CACHE[cwd] = (dir_mtime, result)
+                return result
+        
         return None
     
     @staticmethod
-    def load_config(config_file: Optional[str] = None) -> BuildConfig:
-        """加载配置文件"""
-        if config_file:
-            return BuildConfig.from_toml(config_file)
-        
-        # 自动查找配置文件
-        config_path = ConfigManager.find_config()
-        if config_path:
-            return BuildConfig.from_toml(str(config_path))
+    def invalidate_cache() -> None:
+        """清空 find_config 缓存（创建或删除配置文件后调用）"""
+        ConfigManager._FIND_CACHE.clear()
+    
+    @staticmethod
+    def load_config(config_file: Optional[str] = None, *, validate: bool = False) -> BuildConfig:
+        """
+        加载配置文件
+        
+        Args:
+            config_file: 配置文件路径，为空时自动查找
+            validate: 加载后立即验证
+        """
+        if not config_file:
+            # 自动查找配置文件
+            config_path = ConfigManager.find_config()
+            if not config_path:
+                raise FileNotFoundError(
+                    "未找到配置文件，请创建以下文件之一:\n  " +
+                    "\n  ".join(ConfigManager.DEFAULT_CONFIG_FILES) +
+                    "\n\n使用命令创建默认配置:\n  sikuwa init"
+                )
+            config_file = str(config_path)
         
-        raise FileNotFoundError(
-            "未找到配置文件，请创建以下文件之一:\n  " +
-            "\n  ".join(ConfigManager.DEFAULT_CONFIG_FILES) +
-            "\n\n使用命令创建默认配置:\n  sikuwa init"
-        )
+        config = BuildConfig.from_toml(config_file)
+        if validate:
+            config.validate()
+        return config
     
     @staticmethod
     def create_default_config(output_file: str = "sikuwa.toml") -> None:
@@ -378,6 +486,7 @@ class ConfigManager:
         
         try:
             default_config.save_to_toml(output_file)
+            ConfigManager.invalidate_cache()
             print(f"✓ 已创建默认配置文件: {output_file}")
         except Exception as e:
             print(f"✗ 创建配置文件失败: {e}")
@@ -385,9 +494,9 @@ class ConfigManager:
 
 
 # 便捷函数
-def load_config(config_file: Optional[str] = None) -> BuildConfig:
+def load_config(config_file: Optional[str] = None, *, validate: bool = False) -> BuildConfig:
     """加载配置（便捷函数）"""
-    return ConfigManager.load_config(config_file)
+    return ConfigManager.load_config(config_file, validate=validate)
 
 
 def create_config(output_file: str = "sikuwa.toml") -> None:
@@ -405,26 +514,18 @@ def validate_config(config: BuildConfig) -> List[str]:
         errors.append(str(e))
     
     # 额外检查
-    src_dir = Path(config.src_dir)
-    if not src_dir.exists():
+    if not os.path.isdir(config.src_dir):
         errors.append(f"源码目录不存在: {config.src_dir}")
     
     if config.nuitka_options.windows_icon:
-        icon_path = Path(config.nuitka_options.windows_icon)
-        if not icon_path.exists():
+        if not os.path.isfile(config.nuitka_options.windows_icon):
             errors.append(f"图标文件不存在: {config.nuitka_options.windows_icon}")
     
     return errors
 
 
-"""Sikuwa 配置管理"""
-
-from pathlib import Path
-from typing import List, Dict, Optional
-
-
 class SikuwaConfig:
-    """Sikuwa 项目配置"""
+    """Sikuwa 项目配置（BuildConfig 的简化视图，共用其解析与缓存）"""
     
     def __init__(self, config_path: Path = None):
         if config_path is None:
@@ -435,35 +536,45 @@ class SikuwaConfig:
     
     def _load_config(self):
         """加载配置文件"""
-        if not self.config_path.exists():
-            raise FileNotFoundError(f"配置文件不存在: {self.config_path}")
-        
-        with open(self.config_path, 'rb') as f:
-            data = tomllib.load(f)
+        try:
+            cfg = BuildConfig.from_toml(str(self.config_path))
+        except (ValueError, TypeError):
+            # 缺少 [sikuwa] / project_name 或含未知字段：保持旧行为，使用默认值并忽略未知字段
+            cfg = self._load_lenient()
+        self._cfg = cfg
         
         # 基础配置
-        sikuwa = data.get('sikuwa', {})
-        self.project_name = sikuwa.get('project_name', 'my_project')
-        self.version = sikuwa.get('version', '1.0.0')
-        self.main_script = Path(sikuwa.get('main_script', 'main.py'))
-        self.src_dir = Path(sikuwa.get('src_dir', '.'))
-        self.output_dir = Path(sikuwa.get('output_dir', 'dist'))
-        self.build_dir = Path(sikuwa.get('build_dir', 'build'))
-        self.platforms = sikuwa.get('platforms', ['windows'])
+        self.project_name = cfg.project_name
+        self.version = cfg.version
+        self.main_script = Path(cfg.main_script)
+        self.src_dir = Path(cfg.src_dir)
+        self.output_dir = Path(cfg.output_dir)
+        self.build_dir = Path(cfg.build_dir)
+        self.platforms = cfg.platforms
         
         # Nuitka 配置
-        nuitka = data.get('sikuwa', {}).get('nuitka', {})
-        self.standalone = nuitka.get('standalone', True)
-        self.onefile = nuitka.get('onefile', False)
-        self.follow_imports = nuitka.get('follow_imports', True)
-        self.show_progress = nuitka.get('show_progress', True)
-        self.enable_console = nuitka.get('enable_console', True)
-        
-        self.include_packages = nuitka.get('include_packages', [])
-        self.include_data_files = nuitka.get('include_data_files', [])
-        self.include_data_dirs = nuitka.get('include_data_dirs', [])  # 新增
-        
-        self.extra_args = nuitka.get('extra_args', [])
+        nuitka = cfg.nuitka_options
+        self.standalone = nuitka.standalone
+        self.onefile = nuitka.onefile
+        self.follow_imports = nuitka.follow_imports
+        self.show_progress = nuitka.show_progress
+        self.enable_console = nuitka.enable_console
+        
+        self.include_packages = nuitka.include_packages
+        self.include_data_files = nuitka.include_data_files
+        self.include_data_dirs = nuitka.include_data_dirs
+        
+        self.extra_args = nuitka.extra_args
+    
+    def _load_lenient(self) -> BuildConfig:
+        """按旧版 SikuwaConfig 的宽松规则构建配置"""
+        data = _toml_load(self.config_path)
+        sikuwa = dict(data.get('sikuwa', {}))
+        nuitka = dict(sikuwa.pop('nuitka', {}))
+        nuitka.update(sikuwa.pop('nuitka_options', {}))
+        sikuwa.setdefault('project_name', 'my_project')
+        sikuwa['nuitka_options'] = nuitka
+        return BuildConfig.from_dict(sikuwa)
     
     def __repr__(self):
         return f"<SikuwaConfig project={self.project_name} version={self.version}>"
@@ -4,9 +4,49 @@
 import os
 import sys
 import json
+import atexit
 import hashlib
+import weakref
+from collections import OrderedDict
 from pathlib import Path
 
+# 构建缓存序列化：优先使用 orjson，否则回退到标准库 json（紧凑格式）
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    _json_loads = json.loads
+
+# 构建缓存键哈希（非密码学用途）：优先 blake3，其次 xxh3_128，否则 sha256
+# 不同哈希算法生成的键互不兼容，因此缓存文件名带有算法名
+try:
+    from blake3 import blake3 as _key_hasher
+    _KEY_HASH_NAME = "blake3"
+except ImportError:
+    try:
+        from xxhash import xxh3_128 as _key_hasher
+        _KEY_HASH_NAME = "xxh3"
+    except ImportError:
+        _key_hasher = hashlib.sha256
+        _KEY_HASH_NAME = "sha256"
+
+# 依赖列表序列化结果的缓存条目上限
+_DEP_JSON_CACHE_SIZE = 256
+
+# 存活的 BuildCache 实例；进程退出时统一写盘（弱引用，不延长实例生命周期）
+_live_build_caches = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_build_caches():
+    """进程退出时保存所有有未保存修改的 BuildCache"""
+    for cache in list(_live_build_caches):
+        cache._flush_if_dirty()
+
+
 # 尝试导入C++扩展模块
 try:
     from .pysmartcache import (
@@ -29,8 +69,8 @@ if not cpp_extension_loaded:
         
         def __init__(self, max_size=1000):
             self.max_size = max_size
-            self.cache = {}
-            self.usage_order = []
+            # 按使用顺序排列，末尾为最近使用
+            self.cache = OrderedDict()
         
         def contains(self, key):
             return key in self.cache
@@ -38,35 +78,30 @@ if not cpp_extension_loaded:
         def put(self, key, value):
             if key in self.cache:
                 # 移动到最近使用
-                self.usage_order.remove(key)
+                self.cache.move_to_end(key)
             elif len(self.cache) >= self.max_size:
                 # 移除最久未使用的
-                oldest = self.usage_order.pop(0)
-                del self.cache[oldest]
+                self.cache.popitem(last=False)
             
             self.cache[key] = value
-            self.usage_order.append(key)
             return True
         
         def get(self, key):
-            if key not in self.cache:
+            # 移动到最近使用（键不存在时 move_to_end 抛出 KeyError）
+            try:
+                self.cache.move_to_end(key)
+            except KeyError:
                 return ""
-            
-            # 移动到最近使用
-            self.usage_order.remove(key)
-            self.usage_order.append(key)
             return self.cache[key]
         
         def remove(self, key):
             if key in self.cache:
                 del self.cache[key]
-                self.usage_order.remove(key)
                 return True
             return False
         
         def clear(self):
             self.cache.clear()
-            self.usage_order.clear()
             return True
     
     # 模拟C++扩展的函数
@@ -125,27 +160,46 @@ class BuildCache:
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.max_size = max_size
-        self.cache_file = self.cache_dir / "build_cache.json"
+        if _KEY_HASH_NAME == "sha256":
+            self.cache_file = self.cache_dir / "build_cache.json"
+        else:
+            self.cache_file = self.cache_dir / f"build_cache.{_KEY_HASH_NAME}.json"
         self.cache = self._load_cache()
+        # 依赖列表 -> JSON 文本（LRU，最近使用在末尾），常用依赖列表无需重复序列化
+        self._dep_json_cache = OrderedDict()
+        # 延迟写盘：累计一定修改次数或进程退出时再保存
+        self._dirty = False
+        self._mutations_since_flush = 0
+        _live_build_caches.add(self)
     
     def _load_cache(self):
         """从文件加载缓存"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                pass
-        return {}
+        try:
+            return _json_loads(self.cache_file.read_bytes())
+        except Exception:
+            return {}
     
     def _save_cache(self):
-        """保存缓存到文件"""
+        """保存缓存到文件（先写临时文件再替换，避免写入中断损坏缓存）"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+            tmp_file = self.cache_file.with_suffix('.json.tmp')
+            tmp_file.write_bytes(_json_dumps(self.cache))
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+            self._mutations_since_flush = 0
         except Exception as e:
             print(f"Error saving cache: {e}")
     
+    def _flush_if_dirty(self):
+        """有未保存的修改时写盘"""
+        if self._dirty:
+            self._save_cache()
+    
+    def __del__(self):
+        # 实例被释放前保存未写盘的修改（构造中途失败的实例没有 _dirty）
+        if getattr(self, '_dirty', False):
+            self._save_cache()
+    
     def set_cache_strategy(self, strategy):
         """设置缓存策略 ("lru" 或 "lfu")"""
         # Python实现不支持策略切换，这里只是为了兼容接口
@@ -160,7 +214,10 @@ class BuildCache:
             "command": command,
             "timestamp": os.path.getmtime(__file__)
         }
-        self._save_cache()
+        self._dirty = True
+        self._mutations_since_flush += 1
+        if self._mutations_since_flush >= 64:
+            self._save_cache()
         return True
     
     def get_cached_build_result(self, target, command, dependencies):
@@ -182,9 +239,31 @@ class BuildCache:
     
     def _generate_cache_key(self, target, command, dependencies):
         """生成缓存键"""
-        # 合并所有信息生成唯一的缓存键
-        all_info = f"{target}|{command}|{json.dumps(dependencies, sort_keys=True)}"
-        return hashlib.sha256(all_info.encode()).hexdigest()
+        # 只缓存全部为字符串的依赖列表：字典、数字等值的序列化结果不能只按 tuple 区分
+        # （tuple(dict) 只含键，[1] 与 [True] 相等）
+        dep_cache = self._dep_json_cache
+        dep_key = None
+        deps_json = None
+        if (isinstance(dependencies, (list, tuple))
+                and all(type(dep) is str for dep in dependencies)):
+            dep_key = tuple(dependencies)
+            deps_json = dep_cache.get(dep_key)
+            if deps_json is not None:
+                dep_cache.move_to_end(dep_key)
+        if deps_json is None:
+            deps_json = json.dumps(dependencies, sort_keys=True)
+            if dep_key is not None:
+                dep_cache[dep_key] = deps_json
+                if len(dep_cache) > _DEP_JSON_CACHE_SIZE:
+                    dep_cache.popitem(last=False)
+        
+        # 合并所有信息生成唯一的缓存键（分段 update，结果与拼接后整体哈希相同）
+        h = _key_hasher(target.encode())
+        h.update(b'|')
+        h.update(command.encode())
+        h.update(b'|')
+        h.update(deps_json.encode())
+        return h.hexdigest()
     
     def clean_all_cache(self):
         """清理所有缓存"""
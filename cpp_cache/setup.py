@@ -2,18 +2,35 @@
 # 用于编译和安装C++智能缓存扩展模块的setup文件
 
 from setuptools import setup, Extension
+import os
 import sys
 
 # 获取Python的include目录
 py_include_dirs = [sys.prefix + '/include']
 
+# 编译/链接参数：发布构建，启用优化与 LTO；默认只使用可移植的指令集，
+# 设置 SIKUWA_NATIVE_ARCH=1 时针对本机 CPU 优化（生成的模块不能在较旧的 CPU 上运行）
+native_arch = os.environ.get('SIKUWA_NATIVE_ARCH') == '1'
+if sys.platform == 'win32':
+    compile_args = ['/std:c++17', '/O2', '/GL', '/DNDEBUG']
+    if native_arch:
+        compile_args.append('/arch:AVX2')
+    link_args = ['/LTCG']
+else:
+    compile_args = ['-std=c++17', '-O3', '-flto', '-DNDEBUG', '-fvisibility=hidden']
+    if native_arch:
+        compile_args.append('-march=native')
+    link_args = ['-flto']
+
 # 定义扩展模块
 smart_cache_extension = Extension(
     'pysmartcache',  # 扩展模块名称
     sources=['smart_cache_minimal.cpp', 'pysmartcache_minimal.cpp'],  # 源文件
     include_dirs=[".", *py_include_dirs],  # 包含目录
     language='c++',  # 使用C++
-    extra_compile_args=['/STD:c++17'],  # 编译参数
+    define_macros=[('PY_SSIZE_T_CLEAN', None)],
+    extra_compile_args=compile_args,  # 编译参数
+    extra_link_args=link_args,  # 链接参数
 )
 
 # 设置setup配置
@@ -17,9 +17,12 @@ default_language = 'zh_CN'
 # 翻译目录
 LOCALES_DIR = Path(__file__).parent / 'i18n' / 'locales'
 
-# 当前翻译对象
+# 当前翻译对象（首次调用 _() 时初始化）
 trans = None
 
+# 已加载的翻译对象：语言代码 -> 翻译
+_TRANS_CACHE = {}
+
 def setup_i18n(force_lang: Optional[str] = None):
     """
     初始化国际化支持（添加调试功能）
@@ -36,28 +39,30 @@ def setup_i18n(force_lang: Optional[str] = None):
     # 设置环境变量
     os.environ['LANGUAGE'] = force_lang
     
-    # 创建翻译对象
-    trans = gettext.translation(
-        domain='sikuwa',
-        localedir=LOCALES_DIR,
-        languages=[force_lang],
-        fallback=True
-    )
+    # 创建翻译对象（同一语言只加载一次）
+    trans = _TRANS_CACHE.get(force_lang)
+    if trans is None:
+        trans = gettext.translation(
+            domain='sikuwa',
+            localedir=LOCALES_DIR,
+            languages=[force_lang],
+            fallback=True
+        )
+        _TRANS_CACHE[force_lang] = trans
     
-    # 安装翻译函数
-    trans.install()
+    # 调试：打印当前使用的语言
+    if os.environ.get('SIKUWA_I18N_DEBUG'):
+        print(f"[i18n调试] 当前使用的语言: {force_lang}")
     
     # 返回选择的语言，便于调试时确认当前使用的语言
     return force_lang
 
-# 初始化翻译（默认使用系统语言）
-selected_lang = setup_i18n()
-
-# 调试：打印当前使用的语言
-print(f"[i18n调试] 当前使用的语言: {selected_lang}")
 
-# 导出_函数供其他模块使用
-_ = trans.gettext
+def _(message: str) -> str:
+    """翻译函数（导出供其他模块使用），首次调用时才加载翻译"""
+    if trans is None:
+        setup_i18n()
+    return trans.gettext(message)
 
 
 def test_translation():
@@ -6,28 +6,41 @@ from pathlib import Path
 i18n_dir = Path(__file__).parent
 locale_dir = i18n_dir / "locales"
 
+# 已加载的翻译对象：语言代码 -> 翻译（None 表示系统默认语言）
+_TRANS_CACHE = {}
+
+
+def _get_translation(lang_code=None):
+    """获取指定语言的翻译对象，同一语言只加载一次"""
+    t = _TRANS_CACHE.get(lang_code)
+    if t is None:
+        t = gettext.translation(
+            "sikuwa", 
+            localedir=str(locale_dir),  # 使用字符串路径
+            languages=[lang_code] if lang_code else None,  # None 使用系统默认语言
+            fallback=True    # 如果找不到翻译文件，使用原始字符串
+        )
+        _TRANS_CACHE[lang_code] = t
+    return t
+
+
 # 初始化翻译系统
-translation = gettext.translation(
-    "sikuwa", 
-    localedir=str(locale_dir),  # 使用字符串路径
-    languages=None,  # 使用系统默认语言
-    fallback=True    # 如果找不到翻译文件，使用原始字符串
-)
+translation = _get_translation()
 
 # 导出翻译函数
 _ = translation.gettext
 
+
+def N_(message):
+    """仅标记待翻译文本（供提取工具识别），实际翻译延迟到显示时由 _() 完成"""
+    return message
+
 # 提供切换语言的功能
 def set_language(lang_code):
     """切换当前使用的语言"""
     global translation, _
     try:
-        translation = gettext.translation(
-            "sikuwa", 
-            localedir=str(locale_dir),  # 使用字符串路径
-            languages=[lang_code],
-            fallback=True
-        )
+        translation = _get_translation(lang_code)
         _ = translation.gettext
         return True
     except Exception as e:
@@ -5,13 +5,32 @@ Python 代码分析器 - 识别代码块边界和依赖关系
 """
 
 import ast
+import bisect
 import hashlib
+import os
+import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate
 from enum import Enum, auto
 from dataclasses import dataclass, field
 from typing import List, Dict, Set, Optional, Tuple
 from pathlib import Path
 
 
+# str.splitlines 认作换行、而 '\n' 分割不认的字符
+_OTHER_LINE_BREAKS = re.compile('[\r\v\f\x1c-\x1e\x85\u2028\u2029]')
+
+
+@lru_cache(maxsize=16)
+def _parse_source(source: str) -> ast.Module:
+    """解析源码（按内容缓存最近的语法树，未改动的文件重复分析时无需重新解析）"""
+    return ast.parse(source)
+
+
 class BlockType(Enum):
     """代码块类型"""
     MODULE = auto()      # 模块级
@@ -27,7 +46,19 @@ class BlockType(Enum):
     WITH = auto()        # with 语句
 
 
-@dataclass
+# 需要整体重新编译的结构类型（元组：Enum 的 __hash__ 为 Python 实现，
+# 两个成员时按身份比较的元组查找比 frozenset 更快）
+_STRUCTURAL_TYPES = (BlockType.CLASS, BlockType.FUNCTION)
+
+
+# CodeBlock 使用 __slots__（Python 3.10+ 的 dataclass 才支持 slots 参数）
+if sys.version_info >= (3, 10):
+    _block_dataclass = dataclass(slots=True)
+else:
+    _block_dataclass = dataclass
+
+
+@_block_dataclass
 class CodeBlock:
     """代码块 - 最小编译单元"""
     id: str = ""                    # 唯一标识
@@ -44,15 +75,15 @@ class CodeBlock:
     
     # 依赖信息
     imports: List[str] = field(default_factory=list)      # 导入的模块/名称
-    references: List[str] = field(default_factory=list)   # 引用的名称
+    references: Set[str] = field(default_factory=set)     # 引用的名称
     definitions: List[str] = field(default_factory=list)  # 定义的名称
     dependencies: List[str] = field(default_factory=list) # 依赖的块ID
     
     def compute_hash(self) -> str:
         """计算内容哈希"""
         # 去除空白差异的影响
-        normalized = '\n'.join(line.strip() for line in self.content.splitlines())
-        self.content_hash = hashlib.sha256(normalized.encode()).hexdigest()[:16]
+        normalized = '\n'.join(map(str.strip, self.content.splitlines()))
+        self.content_hash = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
         return self.content_hash
     
     def generate_id(self, file_path: str) -> str:
@@ -63,6 +94,51 @@ class CodeBlock:
         return self.id
 
 
+class _RefCollector:
+    """
+    名称引用收集器
+
+    以显式栈遍历 AST，替代 ast.walk + isinstance 判断链。属性链的根名称本身
+    也是 Name 节点，因此只需收集 Name；遇到 Name 后不再下探（子节点只有 ctx）。
+    """
+    
+    def collect(self, node: ast.AST) -> Set[str]:
+        """收集 node 子树中引用的名称"""
+        refs: Set[str] = set()
+        stack = [node]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            current = pop()
+            if type(current) is ast.Name:
+                refs.add(current.id)
+                continue
+            for name in current._fields:
+                value = getattr(current, name, None)
+                if isinstance(value, list):
+                    for item in value:
+                        if isinstance(item, ast.AST):
+                            push(item)
+                elif isinstance(value, ast.AST):
+                    push(value)
+        return refs
+    
+    def collect_assignment(self, targets: List[ast.AST],
+                           value: Optional[ast.AST]) -> Tuple[List[str], Set[str]]:
+        """一次收集赋值语句的定义名称（目标）与引用名称（值）"""
+        defs: List[str] = []
+        for target in targets:
+            target_type = type(target)
+            if target_type is ast.Name:
+                defs.append(target.id)
+            elif target_type is ast.Tuple or target_type is ast.List:
+                for elt in target.elts:
+                    if type(elt) is ast.Name:
+                        defs.append(elt.id)
+        refs = self.collect(value) if value is not None else set()
+        return defs, refs
+
+
 class PythonAnalyzer:
     """
     Python 代码分析器
@@ -74,6 +150,58 @@ class PythonAnalyzer:
         self.block_map: Dict[str, CodeBlock] = {}
         self.lines: List[str] = []
         self.file_path: str = ""
+        # 行起始偏移（仅当源码只用 '\n' 换行时可用），用于直接切片源码
+        self._source: str = ""
+        self._line_offsets: Optional[List[int]] = None
+        # 反向依赖索引：块ID -> 依赖它的块ID列表
+        self._reverse_deps: Dict[str, List[str]] = {}
+        self._ref_collector = _RefCollector()
+        # 语句节点类型 -> 处理方法（未列出的类型按普通语句处理）
+        self._node_handlers = {
+            ast.Import: self._h_import,
+            ast.ImportFrom: self._h_import_from,
+            ast.ClassDef: self._h_class,
+            ast.FunctionDef: self._h_function,
+            ast.AsyncFunctionDef: self._h_function,
+            ast.Assign: self._h_assign,
+            ast.AugAssign: self._h_aug_assign,
+            ast.AnnAssign: self._h_ann_assign,
+            ast.If: self._h_control,
+            ast.For: self._h_control,
+            ast.While: self._h_control,
+            ast.Try: self._h_control,
+            ast.With: self._h_with,
+            ast.Expr: self._h_expr,
+        }
+        # 按起始行排序的块索引：(起始行列表, 前缀最大结束行, 原始序号列表)
+        self._starts: List[int] = []
+        self._end_max: List[int] = []
+        self._by_start: List[int] = []
+        # 内容哈希缓存：文件路径 -> {块内容: 哈希}，只保留该文件最近一次分析的块
+        self._hash_memo: Dict[str, Dict[str, str]] = {}
+        self._prev_hashes: Dict[str, str] = {}
+        self._hashes: Dict[str, str] = {}
+        # 最近一次完整分析的文件与源码，相同输入直接返回上次结果
+        self._last_file: Optional[str] = None
+        self._last_source: Optional[str] = None
+    
+    def reset(self):
+        """清空分析状态（保留节点处理表），以便复用同一分析器实例"""
+        self.blocks = []
+        self.block_map = {}
+        self.lines = []
+        self.file_path = ""
+        self._source = ""
+        self._line_offsets = None
+        self._reverse_deps = {}
+        self._starts = []
+        self._end_max = []
+        self._by_start = []
+        self._hash_memo = {}
+        self._prev_hashes = {}
+        self._hashes = {}
+        self._last_file = None
+        self._last_source = None
         
     def analyze(self, source: str, file_path: str = "<string>") -> List[CodeBlock]:
         """
@@ -86,13 +214,24 @@ class PythonAnalyzer:
         Returns:
             代码块列表
         """
+        if file_path == self._last_file and source == self._last_source:
+            return self.blocks
+        self._last_file = None
+        
         self.file_path = file_path
         self.lines = source.splitlines()
+        self._source = source
+        if _OTHER_LINE_BREAKS.search(source):
+            self._line_offsets = None
+        else:
+            self._line_offsets = [0, *accumulate(len(line) + 1 for line in self.lines)]
         self.blocks = []
         self.block_map = {}
+        self._prev_hashes = self._hash_memo.get(file_path, {})
+        self._hashes = {}
         
         try:
-            tree = ast.parse(source)
+            tree = _parse_source(source)
             self._analyze_module(tree, source)
         except SyntaxError as e:
             # 语法错误时回退到行级分析
@@ -100,7 +239,12 @@ class PythonAnalyzer:
         
         # 分析依赖关系
         self._analyze_dependencies()
+        self._build_range_index()
         
+        self._hash_memo[file_path] = self._hashes
+        self._prev_hashes = {}
+        self._last_file = file_path
+        self._last_source = source
         return self.blocks
     
     def _analyze_module(self, tree: ast.Module, source: str):
@@ -126,135 +270,136 @@ class PythonAnalyzer:
         if block.start_line > 0 and block.end_line > 0:
             block.content = self._get_source_lines(block.start_line, block.end_line)
         
-        # 根据节点类型设置块类型和名称
-        if isinstance(node, ast.Import):
-            block.type = BlockType.IMPORT
-            block.name = "import"
-            block.imports = [alias.name for alias in node.names]
-            
-        elif isinstance(node, ast.ImportFrom):
-            block.type = BlockType.IMPORT
-            block.name = f"from {node.module}"
-            block.imports = [node.module or ""] + [alias.name for alias in node.names]
-            
-        elif isinstance(node, ast.ClassDef):
-            block.type = BlockType.CLASS
-            block.name = node.name
-            block.definitions = [node.name]
-            # 处理装饰器
-            if node.decorator_list:
-                block.start_line = node.decorator_list[0].lineno
-            # 递归处理类体
-            for child in node.body:
-                child_block = self._node_to_block(child, source, block.id)
-                if child_block:
-                    block.children.append(child_block.id)
-                    self.blocks.append(child_block)
-                    self.block_map[child_block.id] = child_block
-                    
-        elif isinstance(node, ast.FunctionDef) or isinstance(node, ast.AsyncFunctionDef):
-            block.type = BlockType.FUNCTION if not parent_id else BlockType.METHOD
-            block.name = node.name
-            block.definitions = [node.name]
-            # 处理装饰器
-            if node.decorator_list:
-                block.start_line = node.decorator_list[0].lineno
-            # 分析函数体中的引用
-            block.references = self._extract_references(node)
-            
-        elif isinstance(node, ast.Assign):
-            block.type = BlockType.ASSIGNMENT
-            block.definitions = self._extract_targets(node.targets)
-            block.references = self._extract_references(node.value)
-            
-        elif isinstance(node, ast.AugAssign):
-            block.type = BlockType.ASSIGNMENT
-            block.definitions = self._extract_targets([node.target])
-            block.references = self._extract_references(node.value)
-            
-        elif isinstance(node, ast.AnnAssign):
-            block.type = BlockType.ASSIGNMENT
-            if node.target:
-                block.definitions = self._extract_targets([node.target])
-            if node.value:
-                block.references = self._extract_references(node.value)
-                
-        elif isinstance(node, (ast.If, ast.For, ast.While, ast.Try)):
-            block.type = BlockType.CONTROL
-            block.name = node.__class__.__name__.lower()
-            block.references = self._extract_references(node)
-            
-        elif isinstance(node, ast.With):
-            block.type = BlockType.WITH
-            block.references = self._extract_references(node)
-            
-        elif isinstance(node, ast.Expr):
-            block.type = BlockType.EXPRESSION
-            block.references = self._extract_references(node.value)
-            
-        else:
-            block.type = BlockType.STATEMENT
-            block.references = self._extract_references(node)
+        # 按节点类型精确分派（type(node) 查表，替代 isinstance 判断链）
+        handler = self._node_handlers.get(type(node), self._h_default)
+        handler(node, block, source)
         
         # 计算哈希并生成ID
-        block.compute_hash()
+        self._compute_hash(block)
         block.generate_id(self.file_path)
         
         return block
     
+    def _h_import(self, node: ast.Import, block: CodeBlock, source: str):
+        block.type = BlockType.IMPORT
+        block.name = "import"
+        block.imports = [alias.name for alias in node.names]
+    
+    def _h_import_from(self, node: ast.ImportFrom, block: CodeBlock, source: str):
+        block.type = BlockType.IMPORT
+        block.name = f"from {node.module}"
+        block.imports = [node.module or ""] + [alias.name for alias in node.names]
+    
+    def _h_class(self, node: ast.ClassDef, block: CodeBlock, source: str):
+        block.type = BlockType.CLASS
+        block.name = node.name
+        block.definitions = [node.name]
+        # 处理装饰器
+        if node.decorator_list:
+            block.start_line = node.decorator_list[0].lineno
+        # 递归处理类体
+        for child in node.body:
+            child_block = self._node_to_block(child, source, block.id)
+            if child_block:
+                block.children.append(child_block.id)
+                self.blocks.append(child_block)
+                self.block_map[child_block.id] = child_block
+    
+    def _h_function(self, node: ast.AST, block: CodeBlock, source: str):
+        block.type = BlockType.FUNCTION if not block.parent_id else BlockType.METHOD
+        block.name = node.name
+        block.definitions = [node.name]
+        # 处理装饰器
+        if node.decorator_list:
+            block.start_line = node.decorator_list[0].lineno
+        # 分析函数体中的引用
+        block.references = self._extract_references(node)
+    
+    def _h_assign(self, node: ast.Assign, block: CodeBlock, source: str):
+        block.type = BlockType.ASSIGNMENT
+        block.definitions, block.references = self._ref_collector.collect_assignment(
+            node.targets, node.value)
+    
+    def _h_aug_assign(self, node: ast.AugAssign, block: CodeBlock, source: str):
+        block.type = BlockType.ASSIGNMENT
+        block.definitions, block.references = self._ref_collector.collect_assignment(
+            [node.target], node.value)
+    
+    def _h_ann_assign(self, node: ast.AnnAssign, block: CodeBlock, source: str):
+        block.type = BlockType.ASSIGNMENT
+        block.definitions, block.references = self._ref_collector.collect_assignment(
+            [node.target], node.value)
+    
+    def _h_control(self, node: ast.AST, block: CodeBlock, source: str):
+        block.type = BlockType.CONTROL
+        block.name = node.__class__.__name__.lower()
+        block.references = self._extract_references(node)
+    
+    def _h_with(self, node: ast.With, block: CodeBlock, source: str):
+        block.type = BlockType.WITH
+        block.references = self._extract_references(node)
+    
+    def _h_expr(self, node: ast.Expr, block: CodeBlock, source: str):
+        block.type = BlockType.EXPRESSION
+        block.references = self._extract_references(node.value)
+    
+    def _h_default(self, node: ast.AST, block: CodeBlock, source: str):
+        block.type = BlockType.STATEMENT
+        block.references = self._extract_references(node)
+    
+    def _compute_hash(self, block: CodeBlock) -> str:
+        """计算块哈希；内容与上次分析同一文件时相同则直接复用"""
+        content = block.content
+        content_hash = self._hashes.get(content) or self._prev_hashes.get(content)
+        if content_hash is None:
+            content_hash = block.compute_hash()
+        else:
+            block.content_hash = content_hash
+        self._hashes[content] = content_hash
+        return content_hash
+    
     def _get_source_lines(self, start: int, end: int) -> str:
         """获取指定行范围的源代码"""
         if start < 1 or end > len(self.lines):
             return ""
+        offsets = self._line_offsets
+        if offsets is not None:
+            return self._source[offsets[start-1]:offsets[end] - 1]
         return '\n'.join(self.lines[start-1:end])
     
-    def _extract_references(self, node: ast.AST) -> List[str]:
-        """提取节点中引用的名称"""
-        refs = []
-        for child in ast.walk(node):
-            if isinstance(child, ast.Name):
-                refs.append(child.id)
-            elif isinstance(child, ast.Attribute):
-                # 收集属性链的根名称
-                current = child
-                while isinstance(current, ast.Attribute):
-                    current = current.value
-                if isinstance(current, ast.Name):
-                    refs.append(current.id)
-        return list(set(refs))
-    
-    def _extract_targets(self, targets: List[ast.AST]) -> List[str]:
-        """提取赋值目标的名称"""
-        names = []
-        for target in targets:
-            if isinstance(target, ast.Name):
-                names.append(target.id)
-            elif isinstance(target, ast.Tuple) or isinstance(target, ast.List):
-                for elt in target.elts:
-                    if isinstance(elt, ast.Name):
-                        names.append(elt.id)
-        return names
+    def _extract_references(self, node: ast.AST) -> Set[str]:
+        """提取节点中引用的名称（含属性链的根名称）"""
+        return self._ref_collector.collect(node)
     
     def _analyze_dependencies(self):
         """分析块之间的依赖关系"""
         # 构建名称到块的映射
+        # 注：AST 中的标识符（Name.id、def/class 名）已由 CPython 解析器驻留，
+        # 引用与定义名称天然是同一对象，字典查找走身份比较快路径，无需 sys.intern
         name_to_block: Dict[str, str] = {}
         for block in self.blocks:
             for name in block.definitions:
                 name_to_block[name] = block.id
         
-        # 分析每个块的依赖
+        # 分析每个块的依赖，同时建立反向索引
+        reverse_deps: Dict[str, List[str]] = {}
+        defined = name_to_block.keys()
         for block in self.blocks:
-            for ref in block.references:
-                if ref in name_to_block and name_to_block[ref] != block.id:
-                    dep_id = name_to_block[ref]
-                    if dep_id not in block.dependencies:
-                        block.dependencies.append(dep_id)
+            seen = set()
+            # 集合求交：只处理有定义块的引用
+            for ref in block.references & defined:
+                dep_id = name_to_block[ref]
+                if dep_id != block.id and dep_id not in seen:
+                    seen.add(dep_id)
+                    block.dependencies.append(dep_id)
+                    reverse_deps.setdefault(dep_id, []).append(block.id)
+        self._reverse_deps = reverse_deps
     
     def _fallback_line_analysis(self, source: str):
         """回退到行级分析（用于语法错误的代码）"""
         lines = source.splitlines()
         current_block = None
+        current_lines: List[str] = []  # 当前块的源码行，结束时一次拼接
         indent_stack = [(0, None)]  # (indent, block)
         
         for i, line in enumerate(lines, 1):
@@ -270,20 +415,20 @@ class PythonAnalyzer:
                     type=BlockType.FUNCTION,
                     name=stripped.split('(')[0].replace('def ', '').replace('async ', '').strip(),
                     start_line=i,
-                    end_line=i,
-                    content=line
+                    end_line=i
                 )
                 current_block = block
+                current_lines = [line]
                 
             elif stripped.startswith('class '):
                 block = CodeBlock(
                     type=BlockType.CLASS,
                     name=stripped.split('(')[0].split(':')[0].replace('class ', '').strip(),
                     start_line=i,
-                    end_line=i,
-                    content=line
+                    end_line=i
                 )
                 current_block = block
+                current_lines = [line]
                 
             elif stripped.startswith('import ') or stripped.startswith('from '):
                 block = CodeBlock(
@@ -292,7 +437,7 @@ class PythonAnalyzer:
                     end_line=i,
                     content=line
                 )
-                block.compute_hash()
+                self._compute_hash(block)
                 block.generate_id(self.file_path)
                 self.blocks.append(block)
                 self.block_map[block.id] = block
@@ -302,11 +447,12 @@ class PythonAnalyzer:
                 if current_block and indent > indent_stack[-1][0]:
                     # 继续当前块
                     current_block.end_line = i
-                    current_block.content += '\n' + line
+                    current_lines.append(line)
                 else:
                     # 结束当前块
                     if current_block:
-                        current_block.compute_hash()
+                        current_block.content = '\n'.join(current_lines)
+                        self._compute_hash(current_block)
                         current_block.generate_id(self.file_path)
                         self.blocks.append(current_block)
                         self.block_map[current_block.id] = current_block
@@ -319,39 +465,53 @@ class PythonAnalyzer:
                         end_line=i,
                         content=line
                     )
-                    block.compute_hash()
+                    self._compute_hash(block)
                     block.generate_id(self.file_path)
                     self.blocks.append(block)
                     self.block_map[block.id] = block
         
         # 处理最后一个块
         if current_block:
-            current_block.compute_hash()
+            current_block.content = '\n'.join(current_lines)
+            self._compute_hash(current_block)
             current_block.generate_id(self.file_path)
             self.blocks.append(current_block)
             self.block_map[current_block.id] = current_block
     
+    def _build_range_index(self):
+        """建立按起始行排序的索引，供 get_blocks_in_range 二分查找"""
+        blocks = self.blocks
+        self._by_start = sorted(range(len(blocks)), key=lambda i: blocks[i].start_line)
+        self._starts = [blocks[i].start_line for i in self._by_start]
+        self._end_max = list(accumulate((blocks[i].end_line for i in self._by_start), max))
+    
     def get_blocks_in_range(self, start_line: int, end_line: int) -> List[CodeBlock]:
-        """获取指定行范围内的代码块"""
-        result = []
-        for block in self.blocks:
-            # 检查是否有交集
-            if block.start_line <= end_line and block.end_line >= start_line:
-                result.append(block)
-        return result
+        """获取指定行范围内的代码块（按原始顺序）"""
+        blocks = self.blocks
+        # 起始行 <= end_line 的块位于 [0, hi)；从后往前，前缀最大结束行小于 start_line 时即可停止
+        hi = bisect.bisect_right(self._starts, end_line)
+        found = []
+        for pos in range(hi - 1, -1, -1):
+            if self._end_max[pos] < start_line:
+                break
+            index = self._by_start[pos]
+            if blocks[index].end_line >= start_line:
+                found.append(index)
+        found.sort()
+        return [blocks[i] for i in found]
     
     def get_affected_blocks(self, changed_block_ids: Set[str]) -> Set[str]:
         """获取受变更影响的所有块（包括依赖传播）"""
         affected = set(changed_block_ids)
-        queue = list(changed_block_ids)
+        queue = deque(changed_block_ids)
         
         while queue:
-            block_id = queue.pop(0)
+            block_id = queue.popleft()
             # 找出依赖此块的所有块
-            for block in self.blocks:
-                if block_id in block.dependencies and block.id not in affected:
-                    affected.add(block.id)
-                    queue.append(block.id)
+            for dependent_id in self._reverse_deps.get(block_id, ()):
+                if dependent_id not in affected:
+                    affected.add(dependent_id)
+                    queue.append(dependent_id)
         
         return affected
     
@@ -367,30 +527,64 @@ class PythonAnalyzer:
             # 如果块在某个函数/类内，需要重新编译整个结构
             if block.parent_id:
                 parent = self.block_map.get(block.parent_id)
-                if parent and parent.type in (BlockType.CLASS, BlockType.FUNCTION):
+                if parent and parent.type in _STRUCTURAL_TYPES:
                     expanded.add(parent.id)
                     # 也包含所有子块
                     for child_id in parent.children:
                         expanded.add(child_id)
             
             # 如果块是函数/类，包含所有子块
-            if block.type in (BlockType.CLASS, BlockType.FUNCTION):
+            if block.type in _STRUCTURAL_TYPES:
                 for child_id in block.children:
                     expanded.add(child_id)
         
         return expanded
 
 
+# 每个线程复用一个分析器实例
+_TLS = threading.local()
+
+
+def _thread_analyzer() -> PythonAnalyzer:
+    """获取当前线程的分析器（已重置）"""
+    analyzer = getattr(_TLS, 'analyzer', None)
+    if analyzer is None:
+        analyzer = _TLS.analyzer = PythonAnalyzer()
+    else:
+        analyzer.reset()
+    return analyzer
+
+
 def analyze_python_file(file_path: str) -> List[CodeBlock]:
     """分析 Python 文件"""
     with open(file_path, 'r', encoding='utf-8') as f:
         source = f.read()
     
-    analyzer = PythonAnalyzer()
-    return analyzer.analyze(source, file_path)
+    return _thread_analyzer().analyze(source, file_path)
+
+
+def analyze_python_files(paths: List[str],
+                         max_workers: Optional[int] = None) -> Dict[str, List[CodeBlock]]:
+    """
+    并行分析多个 Python 文件（进程池，每个文件独立分析）
+    
+    Args:
+        paths: 文件路径列表
+        max_workers: 最大进程数，默认为 CPU 核心数
+        
+    Returns:
+        文件路径 -> 代码块列表
+    """
+    if len(paths) < 2:
+        return {path: analyze_python_file(path) for path in paths}
+    
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(analyze_python_file, paths, chunksize=chunksize)
+        return dict(zip(paths, results))
 
 
 def analyze_python_source(source: str, file_path: str = "<string>") -> List[CodeBlock]:
     """分析 Python 源代码"""
-    analyzer = PythonAnalyzer()
-    return analyzer.analyze(source, file_path)
+    return _thread_analyzer().analyze(source, file_path)
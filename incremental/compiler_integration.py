@@ -22,6 +22,10 @@ from .core import (
 from .analyzer import PythonAnalyzer, CodeBlock, BlockType
 
 
+# C 字符串转义表（str.translate 单次遍历完成全部替换）
+_C_ESCAPE_TABLE = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+
 @dataclass
 class IncrementalBuildResult:
     """减量编译结果"""
@@ -144,7 +148,7 @@ class IncrementalNativeCompiler:
     
     def _builtin_convert(self, unit: CompilationUnit) -> str:
         """内置转换器 - 将 Python 代码嵌入 C"""
-        escaped = unit.content.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped = unit.content.translate(_C_ESCAPE_TABLE)
         
         unit_name = unit.name or f"unit_{unit.content_hash[:8]}"
         safe_name = ''.join(c if c.isalnum() else '_' for c in unit_name)
@@ -9,7 +9,12 @@
 import hashlib
 import json
 import os
+import sys
 import time
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from enum import Enum, auto
 from dataclasses import dataclass, field
 from typing import List, Dict, Set, Optional, Tuple, Callable, Any
@@ -17,6 +22,45 @@ from pathlib import Path
 
 from .analyzer import PythonAnalyzer, CodeBlock, BlockType
 
+# 缓存序列化：优先使用 orjson，否则回退到标准库 json（紧凑格式）
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    _json_loads = json.loads
+
+# 编译缓存主文件可选使用 msgpack（更小、更快），不可用时保存为 JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# 差异区段超过该行数时才调用 C++ 差分（小输入的调用与转换开销不划算）
+_CPP_DIFF_MIN_LINES = 64
+
+# 超过该字节数的编译产物单独存放在 outputs/ 目录，索引中只保留引用
+_INLINE_OUTPUT_LIMIT = 32 * 1024
+
+# 单独存放的编译产物按需读取，最近读取的若干个保留在内存中
+_OUTPUT_LRU_SIZE = 64
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """先写临时文件并刷盘，再原子替换目标文件（写入中断不会损坏原文件）"""
+    tmp_file = path.with_name(path.name + '.tmp')
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+# 内存中保留的编译历史条数；磁盘日志超过其两倍时压缩重写
+_HISTORY_LIMIT = 10000
+
 
 class UnitType(Enum):
     """编译单元类型"""
@@ -40,7 +84,15 @@ class UnitState(Enum):
     AFFECTED = auto()
 
 
-@dataclass
+# CompilationUnit 使用 __slots__（Python 3.10+ 的 dataclass 才支持 slots 参数），
+# 单元数量随文件规模线性增长，去掉每个实例的 __dict__ 可明显降低快照内存
+if sys.version_info >= (3, 10):
+    _unit_dataclass = dataclass(slots=True)
+else:
+    _unit_dataclass = dataclass
+
+
+@_unit_dataclass
 class CompilationUnit:
     """编译单元 - 最小编译粒度"""
     id: str = ""
@@ -60,8 +112,8 @@ class CompilationUnit:
     
     def compute_hash(self) -> str:
         """计算内容哈希"""
-        normalized = '\n'.join(line.strip() for line in self.content.splitlines())
-        self.content_hash = hashlib.sha256(normalized.encode()).hexdigest()[:16]
+        normalized = '\n'.join(map(str.strip, self.content.splitlines()))
+        self.content_hash = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
         return self.content_hash
     
     def generate_id(self) -> str:
@@ -103,12 +155,16 @@ class CompilationUnit:
         return unit
 
 
+# 修改其内部时需要整体重新编译的单元类型
+_STRUCTURAL_UNIT_TYPES = (UnitType.FUNCTION, UnitType.CLASS)
+
+
 @dataclass
 class Snapshot:
     """版本快照"""
     file_path: str = ""
     content_hash: str = ""
-    line_hashes: List[str] = field(default_factory=list)
+    line_hashes: List[int] = field(default_factory=list)
     units: Dict[str, CompilationUnit] = field(default_factory=dict)
     timestamp: int = 0
 
@@ -131,15 +187,17 @@ class ChangeDetector:
     @staticmethod
     def compute_hash(content: str) -> str:
         """计算内容哈希"""
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
     
     @staticmethod
-    def compute_line_hash(line: str) -> str:
-        """计算行哈希（忽略首尾空白）"""
-        stripped = line.strip()
-        if not stripped:
-            return "empty"
-        return hashlib.sha256(stripped.encode()).hexdigest()[:16]
+    def compute_line_hash(line: str) -> int:
+        """
+        计算行哈希（忽略首尾空白，空行为 0）
+        
+        行哈希只用于同一进程内的快照比对，不落盘，直接使用内置 str 哈希
+        （64 位，无需 encode，且字符串会缓存自身的哈希值）。
+        """
+        return hash(line.strip())
     
     def create_snapshot(self, file_path: str, content: str) -> Snapshot:
         """创建快照"""
@@ -148,8 +206,8 @@ class ChangeDetector:
         snap.content_hash = self.compute_hash(content)
         snap.timestamp = int(time.time() * 1000)
         
-        lines = content.splitlines()
-        snap.line_hashes = [self.compute_line_hash(line) for line in lines]
+        # 整个文件一次性计算行哈希（与 compute_line_hash 等价，省去逐行的方法调用）
+        snap.line_hashes = list(map(hash, map(str.strip, content.splitlines())))
         
         return snap
     
@@ -169,42 +227,177 @@ class ChangeDetector:
         
         return changed
     
-    def _compute_lcs(self, old_hashes: List[str], new_hashes: List[str]) -> List[Tuple[int, int]]:
-        """计算最长公共子序列"""
+    def _compute_lcs(self, old_hashes: List[int], new_hashes: List[int]) -> List[Tuple[int, int]]:
+        """
+        计算最长公共子序列（Myers O(ND) 差分，D 为编辑距离）
+        
+        先剥离公共前缀/后缀，只对中间差异区段运行 Myers 算法；
+        小改动时接近线性，不再构建 m×n 的 DP 表。差异区段按“中间蛇”
+        分治（Hirschberg 思路），内存为 O(m+n)。
+        """
         m, n = len(old_hashes), len(new_hashes)
         
-        # DP 表
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
+        # 公共前缀 / 后缀
+        prefix = 0
+        while prefix < m and prefix < n and old_hashes[prefix] == new_hashes[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < m - prefix and suffix < n - prefix
+               and old_hashes[m - 1 - suffix] == new_hashes[n - 1 - suffix]):
+            suffix += 1
+        
+        # 只在另一侧出现过的行才可能匹配，先滤掉其余行（不影响 LCS 结果）
+        old_mid = old_hashes[prefix:m - suffix]
+        new_mid = new_hashes[prefix:n - suffix]
+        old_set, new_set = set(old_mid), set(new_mid)
+        old_idx = [i for i, h in enumerate(old_mid) if h in new_set]
+        new_idx = [j for j, h in enumerate(new_mid) if h in old_set]
+        old_keep = [old_mid[i] for i in old_idx]
+        new_keep = [new_mid[j] for j in new_idx]
+        if _cpp_lcs_matches is not None and len(old_keep) + len(new_keep) > _CPP_DIFF_MIN_LINES:
+            # 较大的差异区段交给 C++ 扩展（同一算法的原生实现）
+            middle = _cpp_lcs_matches(old_keep, new_keep)
+        else:
+            middle = self._myers_matches(old_keep, new_keep)
+        
+        lcs = [(i, i) for i in range(prefix)]
+        lcs.extend((prefix + old_idx[i], prefix + new_idx[j]) for i, j in middle)
+        lcs.extend((m - suffix + k, n - suffix + k) for k in range(suffix))
+        return lcs
+    
+    @classmethod
+    def _myers_matches(cls, a: List[int], b: List[int]) -> List[Tuple[int, int]]:
+        """线性空间 Myers 差分，返回最长公共子序列的 (a 下标, b 下标) 对"""
+        matches: List[Tuple[int, int]] = []
+        cls._myers_split(a, 0, len(a), b, 0, len(b), matches)
+        return matches
+    
+    @classmethod
+    def _myers_split(cls, a: List[int], a0: int, a1: int,
+                     b: List[int], b0: int, b1: int,
+                     matches: List[Tuple[int, int]]):
+        """在 a[a0:a1] 与 b[b0:b1] 上按中间蛇递归分治，匹配对按顺序追加到 matches"""
+        if a0 >= a1 or b0 >= b1:
+            return
+        d, x, y, u, v = cls._middle_snake(a, a0, a1, b, b0, b1)
+        if d <= 1:
+            # 至多一处增删，贪心差分的回溯快照只有常数大小
+            sub = cls._myers_greedy(a[a0:a1], b[b0:b1])
+            matches.extend((a0 + i, b0 + j) for i, j in sub)
+            return
+        cls._myers_split(a, a0, a0 + x, b, b0, b0 + y, matches)
+        matches.extend((a0 + x + k, b0 + y + k) for k in range(u - x))
+        cls._myers_split(a, a0 + u, a1, b, b0 + v, b1, matches)
+    
+    @staticmethod
+    def _middle_snake(a: List[int], a0: int, a1: int,
+                      b: List[int], b0: int, b1: int) -> Tuple[int, int, int, int, int]:
+        """
+        正反两个方向同时推进 Myers 搜索，返回 (编辑距离, x, y, u, v)
+        
+        (x, y) -> (u, v) 为最优路径中间的对角线段（坐标相对 a0/b0）。
+        """
+        n, m = a1 - a0, b1 - b0
+        delta = n - m
+        odd = delta & 1
+        max_d = (n + m + 1) // 2
+        offset = max_d + 1
+        vf = [0] * (2 * offset + 1)
+        vb = [0] * (2 * offset + 1)
+        for d in range(max_d + 1):
+            # 正向
+            for k in range(-d, d + 1, 2):
+                if k == -d or (k != d and vf[offset + k - 1] < vf[offset + k + 1]):
+                    x = vf[offset + k + 1]
+                else:
+                    x = vf[offset + k - 1] + 1
+                y = x - k
+                sx, sy = x, y
+                while x < n and y < m and a[a0 + x] == b[b0 + y]:
+                    x += 1
+                    y += 1
+                vf[offset + k] = x
+                c = delta - k
+                if odd and -(d - 1) <= c <= d - 1 and x + vb[offset + c] >= n:
+                    return 2 * d - 1, sx, sy, x, y
+            # 反向（在倒序序列上搜索，对角线 c 对应正向的 delta - c）
+            for c in range(-d, d + 1, 2):
+                if c == -d or (c != d and vb[offset + c - 1] < vb[offset + c + 1]):
+                    x = vb[offset + c + 1]
+                else:
+                    x = vb[offset + c - 1] + 1
+                y = x - c
+                sx, sy = x, y
+                while x < n and y < m and a[a1 - 1 - x] == b[b1 - 1 - y]:
+                    x += 1
+                    y += 1
+                vb[offset + c] = x
+                k = delta - c
+                if not odd and -d <= k <= d and x + vf[offset + k] >= n:
+                    return 2 * d, n - x, m - y, n - sx, m - sy
+        return n + m, 0, 0, 0, 0
+    
+    @staticmethod
+    def _myers_greedy(a: List[int], b: List[int]) -> List[Tuple[int, int]]:
+        """Myers 贪心差分（保存每一步快照后回溯），用于编辑距离很小的区段"""
+        n, m = len(a), len(b)
+        if not n or not m:
+            return []
         
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if old_hashes[i - 1] == new_hashes[j - 1]:
-                    dp[i][j] = dp[i - 1][j - 1] + 1
+        offset = n + m
+        v = [0] * (2 * offset + 2)   # v[offset + k]: 对角线 k 上到达的最远 x
+        trace = []                    # 每一步开始时 k∈[-d, d] 的 v 快照
+        reached = False
+        for d in range(offset + 1):
+            trace.append(v[offset - d:offset + d + 1])
+            for k in range(-d, d + 1, 2):
+                if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                    x = v[offset + k + 1]
                 else:
-                    dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
-        
-        # 回溯找出 LCS 对应关系
-        lcs = []
-        i, j = m, n
-        while i > 0 and j > 0:
-            if old_hashes[i - 1] == new_hashes[j - 1]:
-                lcs.append((i - 1, j - 1))
-                i -= 1
-                j -= 1
-            elif dp[i - 1][j] > dp[i][j - 1]:
-                i -= 1
+                    x = v[offset + k - 1] + 1
+                y = x - k
+                while x < n and y < m and a[x] == b[y]:
+                    x += 1
+                    y += 1
+                v[offset + k] = x
+                if x >= n and y >= m:
+                    reached = True
+                    break
+            if reached:
+                break
+        
+        # 回溯：沿每一步的蛇形对角线收集匹配对
+        matches = []
+        x, y = n, m
+        for d in range(len(trace) - 1, 0, -1):
+            snap = trace[d]
+            k = x - y
+            if k == -d or (k != d and snap[k - 1 + d] < snap[k + 1 + d]):
+                prev_k = k + 1
             else:
-                j -= 1
+                prev_k = k - 1
+            prev_x = snap[prev_k + d]
+            prev_y = prev_x - prev_k
+            while x > prev_x and y > prev_y:
+                x -= 1
+                y -= 1
+                matches.append((x, y))
+            x, y = prev_x, prev_y
+        while x > 0 and y > 0:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
         
-        lcs.reverse()
-        return lcs
+        matches.reverse()
+        return matches
     
     def detect_changes(self, old_snap: Snapshot, new_snap: Snapshot) -> List[ChangeRecord]:
         """检测变更"""
         records = []
         
-        old_ids = set(old_snap.units.keys())
-        new_ids = set(new_snap.units.keys())
+        # 直接对字典键视图做集合运算，不复制出中间集合
+        old_ids = old_snap.units.keys()
+        new_ids = new_snap.units.keys()
         
         # 删除的单元
         for uid in old_ids - new_ids:
@@ -262,70 +455,132 @@ class CompilationCache:
     def __init__(self, cache_dir: str):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.outputs_dir = self.cache_dir / "outputs"
+        # 缓存文件路径（构造时计算一次，加载与保存共用）
+        self._cache_path = self.cache_dir / "incremental_cache.json"
+        self._msgpack_path = self.cache_dir / "incremental_cache.msgpack"
+        self._history_path = self.cache_dir / "compile_history.jsonl"
+        self._legacy_history_path = self.cache_dir / "compile_history.json"
+        self._patterns_path = self.cache_dir / "prediction_patterns.json"
+        self._output_lru: OrderedDict = OrderedDict()  # 文件名 -> 产物（最近使用在末尾）
         self._cache: Dict[str, Dict] = {}
         self._hits = 0
         self._misses = 0
-        self._compile_history: List[Dict] = []  # 编译历史
-        self._access_sequence: List[str] = []   # 访问序列
-        self._predictions: Dict[str, List[str]] = {}  # 预测模式
+        self._compile_history: deque = deque(maxlen=_HISTORY_LIMIT)  # 编译历史
+        self._pending_history: List[Dict] = []  # 尚未追加到磁盘日志的历史
+        self._history_lines = 0                 # 磁盘日志当前行数
+        self._history_needs_compact = False     # 需要整体重写日志（如从旧格式迁移）
+        self._access_sequence: deque = deque(maxlen=1000)  # 访问序列（自动淘汰最旧的）
+        # 预测模式：单元ID -> 其后访问过的单元（有序字典，键即单元ID，最多 10 个）
+        self._predictions: Dict[str, Dict[str, None]] = {}
         self._load()
     
     def _load(self):
         """加载缓存"""
-        cache_file = self.cache_dir / "incremental_cache.json"
-        history_file = self.cache_dir / "compile_history.json"
-        patterns_file = self.cache_dir / "prediction_patterns.json"
+        cache_file = self._cache_path
+        msgpack_file = self._msgpack_path
+        history_file = self._history_path
+        legacy_history_file = self._legacy_history_path
+        patterns_file = self._patterns_path
         
-        if cache_file.exists():
+        if msgpack is not None and msgpack_file.exists():
+            try:
+                self._cache = msgpack.unpackb(msgpack_file.read_bytes(), raw=False)
+            except:
+                self._cache = {}
+        elif cache_file.exists():
+            # JSON 格式（未安装 msgpack，或由旧版本写入）
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    self._cache = json.load(f)
+                self._cache = _json_loads(cache_file.read_bytes())
             except:
                 self._cache = {}
         
         if history_file.exists():
+            # 追加式日志：每行一条 JSON 记录
+            try:
+                with open(history_file, 'rb') as f:
+                    for line in f:
+                        self._history_lines += 1
+                        try:
+                            self._compile_history.append(_json_loads(line))
+                        except ValueError:
+                            pass  # 写入中断留下的不完整行
+            except OSError:
+                pass
+        elif legacy_history_file.exists():
+            # 旧版本整体写入的 JSON 列表，下次保存时迁移为日志
             try:
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    self._compile_history = json.load(f)
+                self._compile_history.extend(_json_loads(legacy_history_file.read_bytes()))
             except:
-                self._compile_history = []
+                pass
+            self._history_needs_compact = True
         
         if patterns_file.exists():
             try:
-                with open(patterns_file, 'r', encoding='utf-8') as f:
-                    self._predictions = json.load(f)
+                self._predictions = {
+                    prev_id: dict.fromkeys(next_ids)
+                    for prev_id, next_ids in _json_loads(patterns_file.read_bytes()).items()
+                }
             except:
                 self._predictions = {}
     
     def save(self):
         """保存缓存和历史"""
-        cache_file = self.cache_dir / "incremental_cache.json"
-        history_file = self.cache_dir / "compile_history.json"
-        patterns_file = self.cache_dir / "prediction_patterns.json"
+        cache_file = self._cache_path
+        msgpack_file = self._msgpack_path
+        history_file = self._history_path
+        legacy_history_file = self._legacy_history_path
+        patterns_file = self._patterns_path
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(self._cache, f, indent=2)
+        # 只保留一种格式的主缓存文件，避免加载时读到另一种格式的旧数据
+        if msgpack is not None:
+            _atomic_write_bytes(msgpack_file, msgpack.packb(self._cache, use_bin_type=True))
+            stale_file = cache_file
+        else:
+            _atomic_write_bytes(cache_file, _json_dumps(self._cache))
+            stale_file = msgpack_file
+        try:
+            stale_file.unlink()
+        except FileNotFoundError:
+            pass
         
-        # 只保留最近10000条历史
-        with open(history_file, 'w', encoding='utf-8') as f:
-            json.dump(self._compile_history[-10000:], f, indent=2)
+        # 编译历史只追加新记录；日志过长时按内存中最近的历史压缩重写
+        pending = self._pending_history
+        if (self._history_needs_compact
+                or self._history_lines + len(pending) > 2 * _HISTORY_LIMIT):
+            _atomic_write_bytes(
+                history_file, b''.join(_json_dumps(e) + b'\n' for e in self._compile_history))
+            self._history_lines = len(self._compile_history)
+            self._history_needs_compact = False
+            try:
+                legacy_history_file.unlink()
+            except FileNotFoundError:
+                pass
+        elif pending:
+            with open(history_file, 'ab') as f:
+                f.write(b''.join(_json_dumps(e) + b'\n' for e in pending))
+            self._history_lines += len(pending)
+        pending.clear()
         
-        with open(patterns_file, 'w', encoding='utf-8') as f:
-            json.dump(self._predictions, f, indent=2)
+        _atomic_write_bytes(patterns_file, _json_dumps(
+            {prev_id: list(next_ids) for prev_id, next_ids in self._predictions.items()}))
     
     def has(self, unit_id: str) -> bool:
         return unit_id in self._cache
     
     def get(self, unit_id: str) -> str:
         """缓存即编译 - 命中即零成本获得编译结果"""
-        if unit_id in self._cache:
+        entry = self._cache.get(unit_id)
+        if entry is not None:
             self._hits += 1
             # 记录访问序列
             self._record_access(unit_id)
             # 更新访问时间
-            self._cache[unit_id]['last_access'] = int(time.time() * 1000)
-            self._cache[unit_id]['access_count'] = self._cache[unit_id].get('access_count', 0) + 1
-            return self._cache[unit_id].get('output', '')
+            entry['last_access'] = int(time.time() * 1000)
+            entry['access_count'] = entry.get('access_count', 0) + 1
+            if 'output_ref' in entry:
+                return self._read_output(entry['output_ref'])
+            return entry.get('output', '')
         self._misses += 1
         return ""
     
@@ -334,9 +589,9 @@ class CompilationCache:
             start_line: int = 0, end_line: int = 0):
         """编译即缓存 - 每次编译自动记录"""
         timestamp = int(time.time() * 1000)
+        output_bytes = output.encode('utf-8')
         
-        self._cache[unit_id] = {
-            'output': output,
+        entry = {
             'content_hash': content_hash,
             'timestamp': timestamp,
             'last_access': timestamp,
@@ -344,11 +599,20 @@ class CompilationCache:
             'compile_time_ms': compile_time_ms,
             'file_path': file_path,
             'line_range': [start_line, end_line],
-            'size_bytes': len(output.encode('utf-8')),
+            'size_bytes': len(output_bytes),
         }
+        old_entry = self._cache.get(unit_id)
+        if len(output_bytes) > _INLINE_OUTPUT_LIMIT:
+            # 大产物单独成文件，保存索引时无需重写其内容
+            entry['output_ref'] = self._write_output(unit_id, output_bytes)
+        else:
+            entry['output'] = output
+            if old_entry is not None:
+                self._remove_output(old_entry)
+        self._cache[unit_id] = entry
         
         # 记录编译历史
-        self._compile_history.append({
+        self._append_history({
             'unit_id': unit_id,
             'content_hash': content_hash,
             'timestamp': timestamp,
@@ -364,34 +628,76 @@ class CompilationCache:
         """记录访问序列，用于预测"""
         # 更新访问序列
         self._access_sequence.append(unit_id)
-        if len(self._access_sequence) > 1000:
-            self._access_sequence = self._access_sequence[-500:]
         
         # 学习访问模式
         if len(self._access_sequence) >= 2:
             prev_id = self._access_sequence[-2]
             if prev_id != unit_id:
-                if prev_id not in self._predictions:
-                    self._predictions[prev_id] = []
-                if unit_id not in self._predictions[prev_id]:
-                    self._predictions[prev_id].append(unit_id)
-                # 限制预测列表长度
-                self._predictions[prev_id] = self._predictions[prev_id][:10]
+                next_ids = self._predictions.get(prev_id)
+                if next_ids is None:
+                    next_ids = self._predictions[prev_id] = {}
+                # 限制预测列表长度（保留最先出现的 10 个）
+                if unit_id not in next_ids and len(next_ids) < 10:
+                    next_ids[unit_id] = None
     
     def get_predictions(self, unit_id: str) -> List[str]:
         """获取预测的下一个可能访问的单元"""
-        return self._predictions.get(unit_id, [])
+        return list(self._predictions.get(unit_id, ()))
+    
+    def _write_output(self, unit_id: str, data: bytes) -> str:
+        """写入单独存放的编译产物，返回文件名"""
+        name = hashlib.blake2b(unit_id.encode('utf-8'), digest_size=16).hexdigest() + '.out'
+        self.outputs_dir.mkdir(exist_ok=True)
+        _atomic_write_bytes(self.outputs_dir / name, data)
+        self._output_lru.pop(name, None)
+        return name
+    
+    def _read_output(self, name: str) -> str:
+        """读取单独存放的编译产物（文件丢失时视为未命中）"""
+        lru = self._output_lru
+        try:
+            lru.move_to_end(name)
+            return lru[name]
+        except KeyError:
+            pass
+        try:
+            output = (self.outputs_dir / name).read_bytes().decode('utf-8')
+        except OSError:
+            return ""
+        lru[name] = output
+        if len(lru) > _OUTPUT_LRU_SIZE:
+            lru.popitem(last=False)
+        return output
+    
+    def _remove_output(self, entry: Dict):
+        """删除条目对应的单独存放的编译产物"""
+        name = entry.get('output_ref')
+        if name:
+            self._output_lru.pop(name, None)
+            try:
+                (self.outputs_dir / name).unlink()
+            except FileNotFoundError:
+                pass
     
     def invalidate(self, unit_id: str):
-        self._cache.pop(unit_id, None)
+        entry = self._cache.pop(unit_id, None)
+        if entry is not None:
+            self._remove_output(entry)
         # 记录失效历史
-        self._compile_history.append({
+        self._append_history({
             'unit_id': unit_id,
             'timestamp': int(time.time() * 1000),
             'action': 'invalidate'
         })
     
+    def _append_history(self, entry: Dict):
+        """记录一条编译历史（保存时追加到磁盘日志）"""
+        self._compile_history.append(entry)
+        self._pending_history.append(entry)
+    
     def invalidate_all(self):
+        for entry in self._cache.values():
+            self._remove_output(entry)
         self._cache.clear()
     
     def is_valid(self, unit_id: str, current_hash: str) -> bool:
@@ -401,7 +707,11 @@ class CompilationCache:
     
     def get_compile_history(self, limit: int = 100) -> List[Dict]:
         """获取编译历史"""
-        return self._compile_history[-limit:]
+        if limit <= 0:
+            return list(self._compile_history)[-limit:]
+        recent = list(islice(reversed(self._compile_history), limit))
+        recent.reverse()
+        return recent
     
     def get_hot_units(self, limit: int = 20) -> List[Dict]:
         """获取热点单元（访问最频繁）"""
@@ -516,13 +826,15 @@ class IncrementalCompiler:
             # 找出受影响的编译单元
             affected_ids: Set[str] = set()
             
-            for line in changed_lines:
-                # 找出覆盖此行的单元
-                for unit in new_units:
-                    if unit.start_line <= line <= unit.end_line:
-                        affected_ids.add(unit.id)
-                        unit.state = UnitState.MODIFIED
-                        unit.cache_valid = False
+            # 变更行号升序排列：对每个单元二分查找其行范围内是否有变更行，
+            # O(U log L)，嵌套单元（类与其方法）各自独立判断
+            num_changed = len(changed_lines)
+            for unit in new_units:
+                idx = bisect_left(changed_lines, unit.start_line)
+                if idx < num_changed and changed_lines[idx] <= unit.end_line:
+                    affected_ids.add(unit.id)
+                    unit.state = UnitState.MODIFIED
+                    unit.cache_valid = False
             
             # 传播依赖影响
             affected_ids = self._propagate_dependencies(affected_ids, new_units)
@@ -566,30 +878,25 @@ class IncrementalCompiler:
     def _propagate_dependencies(self, affected_ids: Set[str], 
                                 units: List[CompilationUnit]) -> Set[str]:
         """传播依赖影响"""
-        # 构建依赖图
-        dependents: Dict[str, List[str]] = {}
+        # 构建反向依赖图：单元ID -> 依赖它的单元列表
+        dependents: Dict[str, List[CompilationUnit]] = {}
         for unit in units:
             for dep_id in unit.dependencies:
-                if dep_id not in dependents:
-                    dependents[dep_id] = []
-                dependents[dep_id].append(unit.id)
+                dependents.setdefault(dep_id, []).append(unit)
         
-        # BFS 传播
-        queue = list(affected_ids)
+        # BFS 传播（deque 出队 O(1)，邻接表直接给出单元对象，无需再按 ID 查找）
+        queue = deque(affected_ids)
         visited = set(affected_ids)
         
         while queue:
-            uid = queue.pop(0)
-            for dependent_id in dependents.get(uid, []):
-                if dependent_id not in visited:
-                    visited.add(dependent_id)
-                    queue.append(dependent_id)
+            uid = queue.popleft()
+            for dependent in dependents.get(uid, ()):
+                if dependent.id not in visited:
+                    visited.add(dependent.id)
+                    queue.append(dependent.id)
                     # 标记为受影响
-                    for unit in units:
-                        if unit.id == dependent_id:
-                            unit.state = UnitState.AFFECTED
-                            unit.cache_valid = False
-                            break
+                    dependent.state = UnitState.AFFECTED
+                    dependent.cache_valid = False
         
         return visited
     
@@ -597,27 +904,39 @@ class IncrementalCompiler:
                               units: List[CompilationUnit]) -> Set[str]:
         """扩展到函数/类边界"""
         expanded = set(affected_ids)
-        unit_map = {u.id: u for u in units}
+        enclosing = self._enclosing_structures(units)
         
-        for uid in list(affected_ids):
-            unit = unit_map.get(uid)
-            if not unit:
-                continue
-            
-            # 如果在函数/类内部修改，需要重新编译整个结构
-            for other in units:
-                if other.id == uid:
-                    continue
-                # 检查是否被包含
-                if (other.type in (UnitType.FUNCTION, UnitType.CLASS) and
-                    other.start_line <= unit.start_line and
-                    other.end_line >= unit.end_line):
-                    expanded.add(other.id)
-                    other.state = UnitState.AFFECTED
-                    other.cache_valid = False
+        for uid in affected_ids:
+            # 如果在函数/类内部修改，需要重新编译整个结构（沿外层结构链逐级向上）
+            outer = enclosing.get(uid)
+            while outer is not None:
+                expanded.add(outer.id)
+                outer.state = UnitState.AFFECTED
+                outer.cache_valid = False
+                outer = enclosing.get(outer.id)
         
         return expanded
     
+    @staticmethod
+    def _enclosing_structures(units: List[CompilationUnit]) -> Dict[str, CompilationUnit]:
+        """
+        计算每个单元最近的外层函数/类单元
+        
+        按 (起始行升序, 结束行降序) 排序后用栈扫描一遍，O(U log U)。
+        单元来自 AST，行范围要么嵌套要么不相交。
+        """
+        enclosing: Dict[str, CompilationUnit] = {}
+        stack: List[CompilationUnit] = []
+        for unit in sorted(units, key=lambda u: (u.start_line, -u.end_line)):
+            # 弹出不再包含当前单元的结构
+            while stack and stack[-1].end_line < unit.end_line:
+                stack.pop()
+            if stack:
+                enclosing[unit.id] = stack[-1]
+            if unit.type in _STRUCTURAL_UNIT_TYPES:
+                stack.append(unit)
+        return enclosing
+    
     def get_units_to_compile(self) -> List[str]:
         """获取需要编译的单元ID列表"""
         return self._units_to_compile.copy()
@@ -633,28 +952,38 @@ class IncrementalCompiler:
             return ""
         
         # 检查缓存 - 缓存即编译
-        if unit.cache_valid or self.cache.is_valid(unit_id, unit.content_hash):
-            output = self.cache.get(unit_id)
+        output = self._get_cached_output(unit)
+        if output is not None:
+            return output
+        
+        output, compile_time_ms = self._run_compile_callback(unit)
+        
+        # 编译即缓存：自动记录
+        self.mark_compiled(unit_id, output, compile_time_ms)
+        
+        return output
+    
+    def _get_cached_output(self, unit: CompilationUnit) -> Optional[str]:
+        """缓存命中时返回编译产物（并触发预测预热），否则返回 None"""
+        if unit.cache_valid or self.cache.is_valid(unit.id, unit.content_hash):
+            output = self.cache.get(unit.id)
             if output:
                 unit.cached_output = output
                 unit.cache_valid = True
                 # 触发预测预热
-                self._predictive_warmup(unit_id)
+                self._predictive_warmup(unit.id)
                 return output
-        
-        # 执行编译并计时
+        return None
+    
+    def _run_compile_callback(self, unit: CompilationUnit) -> Tuple[str, int]:
+        """执行编译并计时，返回 (产物, 耗时毫秒)"""
         start_time = time.time()
         if self._compile_callback:
             output = self._compile_callback(unit)
         else:
             # 默认：直接返回源代码（用于测试）
             output = unit.content
-        compile_time_ms = int((time.time() - start_time) * 1000)
-        
-        # 编译即缓存：自动记录
-        self.mark_compiled(unit_id, output, compile_time_ms)
-        
-        return output
+        return output, int((time.time() - start_time) * 1000)
     
     def _predictive_warmup(self, unit_id: str):
         """预测性缓存预热"""
@@ -688,12 +1017,48 @@ class IncrementalCompiler:
         if unit_id in self._units_to_compile:
             self._units_to_compile.remove(unit_id)
     
-    def compile_all_pending(self) -> Dict[str, str]:
-        """编译所有待编译单元"""
-        results = {}
-        for uid in self._units_to_compile.copy():
-            output = self.compile_unit(uid)
-            results[uid] = output
+    def compile_all_pending(self, parallel: bool = False,
+                            max_workers: Optional[int] = None) -> Dict[str, str]:
+        """
+        编译所有待编译单元
+        
+        Args:
+            parallel: 是否用线程池并行调用编译回调（回调需线程安全）
+            max_workers: 线程池最大线程数，默认由 ThreadPoolExecutor 决定
+            
+        Returns:
+            单元ID -> 编译产物（按待编译顺序）
+        """
+        pending = self._units_to_compile.copy()
+        if not parallel or len(pending) < 2:
+            results = {}
+            for uid in pending:
+                output = self.compile_unit(uid)
+                results[uid] = output
+            return results
+        
+        # 主线程先处理缓存命中，只把需要编译的单元交给线程池
+        results = dict.fromkeys(pending, "")
+        jobs: List[CompilationUnit] = []
+        queued: Set[str] = set()
+        for uid in pending:
+            unit = self._units.get(uid)
+            if not unit or uid in queued:
+                continue
+            output = self._get_cached_output(unit)
+            if output is not None:
+                results[uid] = output
+            else:
+                jobs.append(unit)
+                queued.add(uid)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            compiled = list(executor.map(self._run_compile_callback, jobs))
+        
+        # 缓存与状态更新都在主线程完成，无需加锁
+        for unit, (output, compile_time_ms) in zip(jobs, compiled):
+            self.mark_compiled(unit.id, output, compile_time_ms)
+            results[unit.id] = output
         return results
     
     def get_combined_output(self, file_path: str) -> str:
@@ -754,9 +1119,12 @@ class IncrementalCompiler:
 
 # 尝试导入 C++ 扩展
 _cpp_available = False
+_cpp_lcs_matches = None
 try:
     from .cpp import incremental_engine as _cpp_engine
     _cpp_available = True
+    # 旧版本构建的扩展没有该函数
+    _cpp_lcs_matches = getattr(_cpp_engine, 'lcs_matches', None)
 except ImportError:
     pass
 
@@ -25,6 +25,155 @@ static uint64_t fnv1a_hash(const char* data, size_t len) {
     return hash;
 }
 
+// Myers 线性空间差分：在 a[a0:a1] 与 b[b0:b1] 上按"中间蛇"递归分治
+template <typename T>
+class MyersDiff {
+public:
+    MyersDiff(const std::vector<T>& a, const std::vector<T>& b,
+              std::vector<std::pair<int, int>>& out)
+        : a_(a), b_(b), out_(out) {}
+    
+    void split(int a0, int a1, int b0, int b1) {
+        if (a0 >= a1 || b0 >= b1) {
+            return;
+        }
+        int x, y, u, v;
+        int d = middle_snake(a0, a1, b0, b1, x, y, u, v);
+        if (d <= 1) {
+            // 至多一处增删：较短序列是较长序列的子序列，贪心对齐即可
+            bool a_longer = (a1 - a0) > (b1 - b0);
+            int i = a0, j = b0;
+            while (i < a1 && j < b1) {
+                if (a_[i] == b_[j]) {
+                    out_.emplace_back(i, j);
+                    ++i; ++j;
+                } else if (a_longer) {
+                    ++i;
+                } else {
+                    ++j;
+                }
+            }
+            return;
+        }
+        split(a0, a0 + x, b0, b0 + y);
+        for (int k = 0; k < u - x; ++k) {
+            out_.emplace_back(a0 + x + k, b0 + y + k);
+        }
+        split(a0 + u, a1, b0 + v, b1);
+    }
+    
+private:
+    const std::vector<T>& a_;
+    const std::vector<T>& b_;
+    std::vector<std::pair<int, int>>& out_;
+    std::vector<int> vf_, vb_;
+    
+    // 返回编辑距离，(x, y) -> (u, v) 为中间的对角线段（相对 a0/b0）
+    int middle_snake(int a0, int a1, int b0, int b1, int& x, int& y, int& u, int& v) {
+        int n = a1 - a0, m = b1 - b0;
+        int delta = n - m;
+        bool odd = (delta & 1) != 0;
+        int max_d = (n + m + 1) / 2;
+        int off = max_d + 1;
+        vf_.assign(2 * off + 1, 0);
+        vb_.assign(2 * off + 1, 0);
+        for (int d = 0; d <= max_d; ++d) {
+            // 正向
+            for (int k = -d; k <= d; k += 2) {
+                int sx = (k == -d || (k != d && vf_[off + k - 1] < vf_[off + k + 1]))
+                    ? vf_[off + k + 1] : vf_[off + k - 1] + 1;
+                int sy = sx - k;
+                int cx = sx, cy = sy;
+                while (cx < n && cy < m && a_[a0 + cx] == b_[b0 + cy]) {
+                    ++cx; ++cy;
+                }
+                vf_[off + k] = cx;
+                int c = delta - k;
+                if (odd && c >= -(d - 1) && c <= d - 1 && cx + vb_[off + c] >= n) {
+                    x = sx; y = sy; u = cx; v = cy;
+                    return 2 * d - 1;
+                }
+            }
+            // 反向（倒序搜索，对角线 c 对应正向的 delta - c）
+            for (int c = -d; c <= d; c += 2) {
+                int sx = (c == -d || (c != d && vb_[off + c - 1] < vb_[off + c + 1]))
+                    ? vb_[off + c + 1] : vb_[off + c - 1] + 1;
+                int sy = sx - c;
+                int cx = sx, cy = sy;
+                while (cx < n && cy < m && a_[a1 - 1 - cx] == b_[b1 - 1 - cy]) {
+                    ++cx; ++cy;
+                }
+                vb_[off + c] = cx;
+                int k = delta - c;
+                if (!odd && k >= -d && k <= d && cx + vf_[off + k] >= n) {
+                    x = n - cx; y = m - cy; u = n - sx; v = m - sy;
+                    return 2 * d;
+                }
+            }
+        }
+        x = y = u = v = 0;
+        return n + m;
+    }
+};
+
+// 最长公共子序列的 (旧下标, 新下标) 对：剥离公共前后缀、滤掉只出现在一侧的元素，
+// 再对剩余部分运行 Myers 差分
+template <typename T>
+static std::vector<std::pair<int, int>> myers_lcs(const std::vector<T>& old_lines,
+                                                  const std::vector<T>& new_lines) {
+    int m = static_cast<int>(old_lines.size());
+    int n = static_cast<int>(new_lines.size());
+    
+    int prefix = 0;
+    while (prefix < m && prefix < n && old_lines[prefix] == new_lines[prefix]) {
+        ++prefix;
+    }
+    int suffix = 0;
+    while (suffix < m - prefix && suffix < n - prefix &&
+           old_lines[m - 1 - suffix] == new_lines[n - 1 - suffix]) {
+        ++suffix;
+    }
+    
+    std::unordered_set<T> old_set(old_lines.begin() + prefix, old_lines.end() - suffix);
+    std::unordered_set<T> new_set(new_lines.begin() + prefix, new_lines.end() - suffix);
+    std::vector<int> old_idx, new_idx;
+    std::vector<T> old_mid, new_mid;
+    for (int i = prefix; i < m - suffix; ++i) {
+        if (new_set.count(old_lines[i])) {
+            old_idx.push_back(i);
+            old_mid.push_back(old_lines[i]);
+        }
+    }
+    for (int j = prefix; j < n - suffix; ++j) {
+        if (old_set.count(new_lines[j])) {
+            new_idx.push_back(j);
+            new_mid.push_back(new_lines[j]);
+        }
+    }
+    
+    std::vector<std::pair<int, int>> middle;
+    MyersDiff<T> diff(old_mid, new_mid, middle);
+    diff.split(0, static_cast<int>(old_mid.size()), 0, static_cast<int>(new_mid.size()));
+    
+    std::vector<std::pair<int, int>> lcs;
+    lcs.reserve(prefix + middle.size() + suffix);
+    for (int i = 0; i < prefix; ++i) {
+        lcs.emplace_back(i, i);
+    }
+    for (const auto& pair : middle) {
+        lcs.emplace_back(old_idx[pair.first], new_idx[pair.second]);
+    }
+    for (int k = 0; k < suffix; ++k) {
+        lcs.emplace_back(m - suffix + k, n - suffix + k);
+    }
+    return lcs;
+}
+
+std::vector<std::pair<int, int>> lcs_matches(const std::vector<int64_t>& old_hashes,
+                                             const std::vector<int64_t>& new_hashes) {
+    return myers_lcs(old_hashes, new_hashes);
+}
+
 std::string generate_unit_id(const std::string& file_path, int start_line,
                             int end_line, const std::string& content_hash) {
     std::ostringstream oss;
@@ -368,38 +517,8 @@ std::vector<std::pair<int, int>> ChangeDetector::compute_lcs(
     const std::vector<std::string>& old_lines,
     const std::vector<std::string>& new_lines) {
     
-    int m = static_cast<int>(old_lines.size());
-    int n = static_cast<int>(new_lines.size());
-    
-    // DP 表
-    std::vector<std::vector<int>> dp(m + 1, std::vector<int>(n + 1, 0));
-    
-    for (int i = 1; i <= m; ++i) {
-        for (int j = 1; j <= n; ++j) {
-            if (old_lines[i - 1] == new_lines[j - 1]) {
-                dp[i][j] = dp[i - 1][j - 1] + 1;
-            } else {
-                dp[i][j] = std::max(dp[i - 1][j], dp[i][j - 1]);
-            }
-        }
-    }
-    
-    // 回溯找出 LCS 对应关系
-    std::vector<std::pair<int, int>> lcs;
-    int i = m, j = n;
-    while (i > 0 && j > 0) {
-        if (old_lines[i - 1] == new_lines[j - 1]) {
-            lcs.push_back({i - 1, j - 1});
-            --i; --j;
-        } else if (dp[i - 1][j] > dp[i][j - 1]) {
-            --i;
-        } else {
-            --j;
-        }
-    }
-    
-    std::reverse(lcs.begin(), lcs.end());
-    return lcs;
+    // Myers O(ND) 差分，替代 O(mn) 的 DP 表
+    return myers_lcs(old_lines, new_lines);
 }
 
 std::vector<ChangeRecord> ChangeDetector::detect_changes(const Snapshot& old_snap,
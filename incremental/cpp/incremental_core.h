@@ -274,6 +274,10 @@ void write_file(const std::string& path, const std::string& content);
 // 分割行
 std::vector<std::string> split_lines(const std::string& content);
 
+// 行哈希序列的最长公共子序列，返回 (旧下标, 新下标) 对（Myers 差分）
+std::vector<std::pair<int, int>> lcs_matches(const std::vector<int64_t>& old_hashes,
+                                             const std::vector<int64_t>& new_hashes);
+
 // 合并行
 std::string join_lines(const std::vector<std::string>& lines);
 
@@ -127,4 +127,5 @@ PYBIND11_MODULE(incremental_engine, m) {
     m.def("compute_hash", &ChangeDetector::compute_hash);
     m.def("split_lines", &split_lines);
     m.def("join_lines", &join_lines);
+    m.def("lcs_matches", &lcs_matches);
 }
@@ -59,7 +59,7 @@ class Calculator:
     
     for block in blocks:
         type_name = block.type.name.lower()
-        deps = ', '.join(block.references[:5]) if block.references else '无'
+        deps = ', '.join(sorted(block.references)[:5]) if block.references else '无'
         print(f"  [{type_name:10}] {block.name:20} 行 {block.start_line:2}-{block.end_line:2}  依赖: {deps}")
 
 
@@ -88,6 +88,20 @@ def outer():
         self.assertEqual(len(func_blocks), 1)
         self.assertIn('x', func_blocks[0].references)
 
+    def test_affected_blocks_transitive(self):
+        """测试依赖传播（间接依赖也受影响）"""
+        code = '''
+a = 1
+b = a + 1
+c = b + 1
+d = 0
+'''
+        blocks = self.analyzer.analyze(code, "test.py")
+        by_name = {blk.definitions[0]: blk.id for blk in blocks}
+
+        affected = self.analyzer.get_affected_blocks({by_name['a']})
+        self.assertEqual(affected, {by_name['a'], by_name['b'], by_name['c']})
+
 
 class TestChangeDetector(unittest.TestCase):
     """测试变更检测器"""
@@ -159,6 +173,13 @@ class TestChangeDetector(unittest.TestCase):
         
         self.assertEqual(len(changes), 1)
         self.assertEqual(changes[0].change_type, UnitState.DELETED)
+    
+    def test_changed_lines(self):
+        """测试行级变更定位（插入与修改）"""
+        old = self.detector.create_snapshot("test.py", "a = 1\nb = 2\nc = 3\nd = 4\n")
+        new = self.detector.create_snapshot("test.py", "a = 1\nx = 0\nb = 2\nc = 30\nd = 4\n")
+        
+        self.assertEqual(self.detector.get_changed_lines(old, new), [2, 4])
 
 
 class TestCompilationCache(unittest.TestCase):
@@ -260,6 +281,26 @@ def world():
         # 验证有输出
         self.assertGreater(len(outputs1) + len(outputs2), 0)
     
+    def test_parallel_compile(self):
+        """测试并行编译（结果与顺序编译一致）"""
+        code = '''
+def hello():
+    print("Hello")
+
+def world():
+    print("World")
+'''
+        self.compiler.analyze_source("test.py", code)
+        self.compiler.update_source("test.py", code)
+        pending = self.compiler.get_units_to_compile()
+        
+        outputs = self.compiler.compile_all_pending(parallel=True, max_workers=2)
+        
+        self.assertEqual(list(outputs), pending)
+        for uid, output in outputs.items():
+            self.assertEqual(output, self.compiler._units[uid].content.upper())
+        self.assertEqual(self.compiler.get_units_to_compile(), [])
+    
     def test_dependency_propagation(self):
         """测试依赖传播"""
         code = '''